@@ -1,13 +1,31 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
 import re
 import uuid
 import json
-from urllib.parse import quote, urljoin
+from urllib.parse import quote
 import random
-import requests
-from bs4 import BeautifulSoup
 import time
+import os
+import csv
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from catalog_snapshot import CatalogSnapshot, search_catalog
+from catalog_store import CatalogStore
+from request_log import create_request_logger
+from product_identity import LOCAL_VENDOR, stable_product_id, merge_products
+from vendors import search_vendors, vendor_status, cached_vendor_results
+from inference_server import RemoteGenerator, InferenceError
+from llm_cache import canned_response
+from warmup import start_warmup
+from suggest import SuggestionIndex
+from query_normalizer import QueryNormalizer
+from facets import FacetIndex
+from clarification import (
+    MULTI_SLOT, KNOWN_BRANDS, FEATURE_KEYWORDS,
+    clarification_prompt, parse_multi_slot_reply, apply_optional_defaults, is_default
+)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
@@ -15,69 +33,21 @@ CORS(app)  # Enable CORS for React frontend
 # In-memory session store
 sessions = {}
 
-# Web scraping function
-def scrape_amazon_products(item, budget):
-    try:
-        base_url = f"https://www.amazon.com/s?k={item.replace(' ', '+')}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5"
-        }
-        for attempt in range(3):  # Retry 3 times
-            response = requests.get(base_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-            products = []
-            for product in soup.select(".s-result-item"):
-                title_elem = product.select_one(".a-text-normal")
-                price_elem = product.select_one(".a-price-whole")
-                link_elem = product.select_one(".a-link-normal")
-                availability_elem = product.select_one(".a-row.a-size-base:contains('In Stock')") or product.select_one(".a-row.a-size-base:contains('Only')")
-                delivery_elem = product.select_one(".a-row:contains('FREE delivery')") or product.select_one(".a-row:contains('Get it as soon as')")
-                
-                if title_elem and price_elem and link_elem:
-                    title = title_elem.get_text(strip=True)
-                    price_text = price_elem.get_text(strip=True).replace(",", "").replace("$", "")
-                    price = float(price_text) if price_text.replace(".", "").isdigit() else float('inf')
-                    link = urljoin(base_url, link_elem.get("href"))
-                    
-                    # Extract availability
-                    availability = "In Stock" if availability_elem and "In Stock" in availability_elem.get_text() else "Check site"
-                    if availability_elem and "Only" in availability_elem.get_text():
-                        availability = "Limited Stock"
-                    
-                    # Extract delivery time
-                    delivery_time = "Varies"
-                    if delivery_elem:
-                        delivery_text = delivery_elem.get_text(strip=True).lower()
-                        if "free delivery" in delivery_text or "get it as soon as" in delivery_text:
-                            if "tomorrow" in delivery_text or "next day" in delivery_text:
-                                delivery_time = "1 day"
-                            elif "2 days" in delivery_text or "two days" in delivery_text:
-                                delivery_time = "2 days"
-                            elif "mon" in delivery_text or "tue" in delivery_text or "wed" in delivery_text or "thu" in delivery_text or "fri" in delivery_text or "sat" in delivery_text or "sun" in delivery_text:
-                                delivery_time = "2-5 days"  # Approximate based on typical Amazon delivery
-
-                    if price <= budget:
-                        products.append({
-                            "title": title,
-                            "price": price,
-                            "link": link,
-                            "description": "From Amazon",
-                            "availability": availability,
-                            "delivery_time": delivery_time,
-                            "product_id": str(uuid.uuid4()),
-                            "category": item.capitalize()  # Use the search item as category
-                        })
-            if products:
-                return products[:3]
-            time.sleep(2 ** attempt)  # Exponential backoff
-        print("Web scraping failed after retries. Using local catalog only.")
-        return []
-    except Exception as e:
-        print(f"Web scraping failed: {str(e)}. Using local catalog only.")
-        return []
+# "single" asks for one missing slot per turn, "multi" asks for all of them at once
+CLARIFY_MODE = os.getenv("CLARIFY_MODE", "single")
+
+# Worker pool size for /api/batch
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "8"))
+
+# Threads for speculative vendor searches while clarification questions are pending (0 disables)
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "8"))
+prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch") if PREFETCH_WORKERS > 0 else None
+
+# Background JSONL log of served turns for replay and analysis
+request_logger = create_request_logger()
+
+# Optional shared Flan-T5 server (python inference_server.py); every worker reuses one loaded model
+generator = RemoteGenerator(os.getenv("INFERENCE_SOCKET"), timeout=float(os.getenv("INFERENCE_TIMEOUT", "30"))) if os.getenv("INFERENCE_SOCKET") else None
 
 # Catalog generation
 def generate_catalog():
@@ -122,11 +92,29 @@ def generate_catalog():
                     "delivery_time": delivery,
                     "category": category,
                     "link": "https://example.com/product/placeholder",
-                    "product_id": str(uuid.uuid4())
+                    "vendor": LOCAL_VENDOR,
+                    "product_id": stable_product_id(title, LOCAL_VENDOR, "https://example.com/product/placeholder")
                 })
     return products
 
-catalog = generate_catalog()
+# Workers share the read-only mmap snapshot (python catalog_snapshot.py) when one has been compiled
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", "catalog.bin")
+# Live SKU updates from /api/admin/catalog are journaled and layered over the base catalog
+catalog = CatalogStore(
+    CatalogSnapshot(CATALOG_SNAPSHOT) if os.path.exists(CATALOG_SNAPSHOT) else generate_catalog(),
+    journal_path=os.getenv("CATALOG_JOURNAL", "catalog_updates.jsonl"),
+    snapshot_path=CATALOG_SNAPSHOT
+)
+# Typeahead terms from the catalog, kept in step with live SKU updates
+suggestions = SuggestionIndex()
+# Spelling, synonym and plural fixes for item names ("labtop", "display", "chairs") before any lookup
+normalizer = QueryNormalizer()
+# Category, price and availability aggregates for /api/facets and budget hints
+facet_index = FacetIndex()
+# All three are filled from one pass over the catalog off the startup path. Until then
+# suggestions are empty, item names pass through unchanged and budget hints are skipped.
+index_loader = threading.Thread(target=catalog.attach, args=(suggestions, normalizer, facet_index), name="catalog-indexes", daemon=True)
+index_loader.start()
 
 def extract_details(user_input): #extract details
     intent = "purchase_request" if any(keyword in user_input.lower() for keyword in [
@@ -134,7 +122,7 @@ def extract_details(user_input): #extract details
     ]) else "general_query"
 
     item_match = re.search(
-        r"(?:I need|I want|buy|get|purchase|order|search|list|look)\s*(?:a|an)?\s*([\w\s]+?)(?=\s*(?:under|below|less than|between|more than|around|equal|cheap|for|to use for|with|delivered|by|in|$)|\s*$)",
+        r"(?:I need|I want|buy|get|purchase|order|search|list|look)\s*(?:(?:a|an)\b)?\s*([\w\s\-\"”]+?)(?=\s*(?:under|below|less than|between|more than|around|equal|cheap|for|to use for|with|delivered|by|in)\b|\s*$)",
         user_input, re.IGNORECASE)
     item = item_match.group(1).strip() if item_match else ""
 
@@ -155,8 +143,7 @@ def extract_details(user_input): #extract details
     brand = brand_match.group(1).strip() if brand_match else None
     if not brand:
         # Try to extract brand from item phrase if present (e.g., "Steelcase office chair")
-        known_brands = ["Steelcase", "Herman Miller", "IKEA", "Logitech", "Razer", "Dell", "Samsung", "Apple", "Lenovo", "Uplift"]
-        for b in known_brands:
+        for b in KNOWN_BRANDS:
             if b.lower() in user_input.lower():
                 brand = b
                 break
@@ -168,13 +155,12 @@ def extract_details(user_input): #extract details
     features = features_match.group(1).strip() if features_match else None
     if not features:
         # Try to extract features from item phrase if present (e.g., "ergonomic office chair")
-        feature_keywords = ["ergonomic", "lumbar support", "adjustable height", "mesh", "reclining", "portable", "wireless", "mechanical", "RGB", "backlit"]
-        found_features = [f for f in feature_keywords if f in user_input.lower()]
+        found_features = [f for f in FEATURE_KEYWORDS if f.lower() in user_input.lower()]
         if found_features:
             features = ", ".join(found_features)
 
     delivery_match = re.search(
-        r"(?:delivered (?:within|in|by)|need (?:it )?in|delivery (?:in|by|within)|arrive (?:in|by|within)|as soon as possible|urgent|quick delivery)\s*([\w\- ]+)",
+        r"(?:delivered (?:within|in|by)|need (?:it )?in\b|delivery (?:in|by|within)|arrive (?:in|by|within)|as soon as possible|urgent|quick delivery)\s*([\w\- ]+)",
         user_input, re.IGNORECASE)
     if delivery_match:
         delivery_time = delivery_match.group(1).strip()
@@ -245,6 +231,12 @@ def generate_clarification_question(missing_slot, item=None):
         "urgency": "How soon do you need the item delivered?"
     }.get(missing_slot, "Could you provide more details about your request?")
 
+def ask_clarification(missing_slot, item=None):
+    # Budget questions mention the catalog's typical price range for the item
+    question = generate_clarification_question(missing_slot, item)
+    hint = facet_index.budget_hint(item) if missing_slot == "budget" and item else None
+    return f"{question} {hint}" if hint else question
+
 def interpret_response(user_input, current_slot):
     if current_slot == "budget":
         budget_match = re.search(r"\$?(\d+\.?\d*)", user_input, re.IGNORECASE)
@@ -280,12 +272,81 @@ def passes_company_policy(product):
             return False, f"Product rejected due to restricted term: '{word}'."
     return True, ""
 
+def find_products(context, scraped_products=None):
+    catalog.refresh()  # Pick up SKU changes applied by other workers
+    # Filter products by budget, item, and urgency (if applicable)
+    local_products = search_catalog(
+        catalog, context["item"], context["budget"],
+        predicate=lambda p: context["urgency"] in p["delivery_time"] if context["urgency"] and not is_default("urgency", context["urgency"]) else True,
+        limit=3
+    )
+    if scraped_products is None:
+        scraped_products = search_vendors(vendor_item(context), context["budget"])
+    vendor_products = [p for p in scraped_products if p["price"] <= context["budget"]]
+
+    # merge_products copies, so scores never leak into the shared catalog or scrape results
+    products = merge_products(local_products, vendor_products)
+    for p in products:
+        p["match_score"] = score_product(p, context)
+    return sorted(products, key=lambda x: x["match_score"], reverse=True)[:3]
+
+def vendor_item(context):
+    # Vendors get the item as the user wrote it; the normalized spelling is only for the local catalog
+    return context.get("vendor_item") or context.get("item")
+
+def prefetch_key(context):
+    return ((vendor_item(context) or "").lower(), context.get("budget"))
+
+def start_prefetch(session):
+    # Once item and budget are known the vendor search starts in the background, so the
+    # remaining slots only re-rank its results. A new item or budget cancels the old search.
+    context = session["context"]
+    if prefetch_pool is None or not context.get("item") or not context.get("budget"):
+        return
+    current = session.get("prefetch")
+    if current and current["key"] == prefetch_key(context):
+        return
+    if current:
+        current["future"].cancel()  # A search already running finishes, but its result is dropped
+    session["prefetch"] = {"key": prefetch_key(context), "future": prefetch_pool.submit(search_vendors, vendor_item(context), context["budget"])}
+
+def take_prefetched(session):
+    # Vendor results from the speculative search, or None if they don't match the final item and budget
+    current = session.pop("prefetch", None)
+    if current is None:
+        return None
+    if current["key"] != prefetch_key(session["context"]):
+        current["future"].cancel()
+        return None
+    try:
+        return current["future"].result()  # search_vendors is bounded by VENDOR_DEADLINE
+    except Exception as e:
+        print(f"Speculative vendor search failed: {str(e)}")
+        return None
+
+@app.before_request
+def start_turn_timer():
+    g.request_started = time.time()
+
+@app.after_request
+def log_turn(response):
+    turn = g.get("turn_log")
+    if request_logger and turn is not None:
+        # Never blocks: the logger queues the entry and a background thread writes it
+        turn["kind"] = "turn"
+        turn["context"] = dict(sessions.get(turn["session_id"], {}).get("context", {}))
+        turn["status"] = response.status_code
+        turn["timings"]["total_ms"] = round((time.time() - g.request_started) * 1000, 2)
+        request_logger.log(turn)
+    return response
+
 @app.route('/api/submit', methods=['POST'])
 def submit_request():
     data = request.get_json()
     user_input = data.get('input', '')
     session_id = data.get('session_id', str(uuid.uuid4()))
     current_slot = data.get('current_slot', None)
+    clarify_mode = data.get('clarify_mode', CLARIFY_MODE)
 
     if session_id not in sessions:
         sessions[session_id] = {
@@ -293,13 +354,28 @@ def submit_request():
             "history": [],
             "best_product": None,
             "passes_policy": None,
-            "policy_reason": ""
+            "policy_reason": "",
+            "prefetch": None
         }
 
     context = sessions[session_id]["context"]
+    g.turn_log = {"session_id": session_id, "input": user_input, "current_slot": current_slot, "timings": {}}
+
+    # Handle a single reply that answers several slots at once
+    if current_slot == MULTI_SLOT:
+        values = parse_multi_slot_reply(user_input, check_clarity(context))
+        context.update(values)
+        apply_optional_defaults(context)
+        filled = ", ".join(f"{slot} set to {value}" for slot, value in values.items())
+        sessions[session_id]["history"].append({
+            "user": user_input,
+            "bot": f"Got it, {filled}." if filled else "Got it, using defaults for the details you skipped.",
+            "intent": "clarification",
+            "context": context.copy()
+        })
 
     # Handle clarification response for a current slot
-    if current_slot:
+    elif current_slot:
         value = interpret_response(user_input, current_slot)
         if value is not None:
             context[current_slot] = value
@@ -311,7 +387,7 @@ def submit_request():
             })
         else:
             # If the input is invalid, ask again for the same slot with product-specific question
-            response = generate_clarification_question(current_slot, context.get("item"))
+            response = ask_clarification(current_slot, context.get("item"))
             sessions[session_id]["history"].append({
                 "user": user_input,
                 "bot": response,
@@ -328,9 +404,13 @@ def submit_request():
 
     # Extract details from new input only if no current slot is being clarified
     if not current_slot:
+        extract_started = time.time()
         item, budget, intent, purpose, delivery_time, brand, features = extract_details(user_input)
+        g.turn_log["timings"]["extract_ms"] = round((time.time() - extract_started) * 1000, 2)
+        g.turn_log["intent"] = intent
         if item and not context["item"]:
-            context["item"] = item
+            context["item"] = normalizer.normalize(item)
+            context["vendor_item"] = item
         if budget and not context["budget"]:
             context["budget"] = budget
         if purpose and not context["purpose"]:
@@ -349,11 +429,35 @@ def submit_request():
                 "context": context.copy()
             })
 
+        # Small talk goes to the shared model server when one is configured
+        if intent == "general_query" and not context["item"] and generator is not None:
+            response = canned_response("general_query", user_input)
+            if response is None:
+                try:
+                    prompt = f"""You are a procurement chatbot. The user said: '{user_input}'. Respond politely and ask what they would like to purchase."""
+                    response = generator(prompt, max_length=150)[0]["generated_text"]
+                except (OSError, InferenceError) as e:
+                    print(f"Inference server unavailable: {str(e)}")
+            if response:
+                sessions[session_id]["history"].append({
+                    "user": user_input,
+                    "bot": response,
+                    "intent": intent,
+                    "context": context.copy()
+                })
+                return jsonify({
+                    "response": response,
+                    "current_slot": None,
+                    "history": sessions[session_id]["history"],
+                    "context": context
+                })
+
+    start_prefetch(sessions[session_id])
+
     # Check for missing slots
     missing_slots = check_clarity(context)
     if missing_slots:
-        next_slot = missing_slots[0]
-        response = generate_clarification_question(next_slot, context.get("item"))
+        response, next_slot = clarification_prompt(missing_slots, context.get("item"), clarify_mode, ask_clarification)
         sessions[session_id]["history"].append({
             "user": user_input,
             "bot": response,
@@ -383,19 +487,12 @@ def submit_request():
             "context": context
         })
 
-    # Filter products by budget, item, and urgency (if applicable)
-    local_products = [
-        p for p in catalog
-        if p["price"] <= context["budget"] and
-        context["item"].lower() in p["title"].lower() and
-        (context["urgency"] in p["delivery_time"] if context["urgency"] else True)
-    ][:3]
-    amazon_products = scrape_amazon_products(context["item"], context["budget"])
-    
-    products = local_products + amazon_products
-    for p in products:
-        p["match_score"] = score_product(p, context)
-    products = sorted(products, key=lambda x: x["match_score"], reverse=True)[:3]
+    search_started = time.time()
+    scraped_products = take_prefetched(sessions[session_id])
+    g.turn_log["prefetched"] = scraped_products is not None
+    products = find_products(context, scraped_products)
+    g.turn_log["timings"]["search_ms"] = round((time.time() - search_started) * 1000, 2)
+    g.turn_log["candidates"] = [{"title": p["title"], "price": p["price"], "match_score": p["match_score"]} for p in products]
 
     if not products:
         response = f"No suitable {context['item']} found under ${context['budget']:.2f}. Please adjust your budget or try again."
@@ -460,6 +557,182 @@ def submit_request():
         "products": products
     })
 
+def batch_entry_text(entry):
+    if isinstance(entry, dict):
+        entry = entry.get("request") or entry.get("input") or ""
+    return str(entry).strip()
+
+def parse_batch_payload(payload, content_type):
+    lines = []
+    if "csv" in content_type:
+        rows = [row for row in csv.reader(io.StringIO(payload)) if any(cell.strip() for cell in row)]
+        header = [cell.strip().lower() for cell in rows[0]] if rows else []
+        column = next((header.index(name) for name in ["request", "input", "line"] if name in header), None)
+        if column is not None:
+            rows = rows[1:]
+        # Without a header, unquoted commas inside a request just split it into extra cells
+        lines = [row[column].strip() if column is not None and column < len(row) else ", ".join(cell.strip() for cell in row) for row in rows]
+    else:
+        for raw in payload.splitlines():
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                entry = raw  # Plain text line
+            # A JSON list on one line carries several requests
+            lines.extend(batch_entry_text(e) for e in (entry if isinstance(entry, list) else [entry]))
+    return [line for line in lines if line]
+
+# A leading number is a quantity only when a space or a unit follows it and it isn't a size ("27 inch monitor")
+QUANTITY_PATTERN = re.compile(
+    r"^\s*(\d+)(?:\s*(?:x|pcs|units?(?:\s+of)?)\s+|\s+)"
+    r"(?!(?:inch(?:es)?|in|cm|mm|ft|feet|gb|tb|mb|hz|w|watts?|mp|kg|lbs?|oz|l|ml|litres?|liters?)\b|[\"”'])(.*)$",
+    re.IGNORECASE
+)
+
+def extract_batch_line(line):
+    # "20 wireless keyboards under $60 for new hires" -> quantity 20 + the usual slots
+    quantity_match = QUANTITY_PATTERN.match(line)
+    quantity = int(quantity_match.group(1)) if quantity_match and quantity_match.group(2) else 1
+    text = quantity_match.group(2) if quantity_match and quantity_match.group(2) else line
+    if not re.match(r"^\s*(?:I need|I want|buy|get|purchase|order)\b", text, re.IGNORECASE):
+        text = f"I need {text}"
+    item, budget, intent, purpose, delivery_time, brand, features = extract_details(text)
+    context = {"item": normalizer.normalize(item), "vendor_item": item, "budget": budget, "purpose": purpose, "brand": brand, "features": features, "urgency": delivery_time}
+    apply_optional_defaults(context)
+    return quantity, context
+
+def process_batch_line(index, line, quantity, context, scraped_products=None):
+    started = time.time()
+    result = {"line": index, "request": line, "quantity": quantity, "context": context}
+    if not context["item"] or not context["budget"]:
+        result["error"] = "Could not find both an item and a budget in this line."
+    else:
+        products = find_products(context, scraped_products)
+        result["products"] = products
+        if products:
+            best_product = products[0]
+            passes_policy, reason = passes_company_policy(best_product)
+            result.update({
+                "best_product": best_product,
+                "total_price": round(best_product["price"] * quantity, 2),
+                "passes_policy": passes_policy,
+                "policy_reason": reason
+            })
+        else:
+            result["error"] = f"No suitable {context['item']} found under ${context['budget']:.2f}."
+    result["elapsed_ms"] = round((time.time() - started) * 1000, 1)
+    return result
+
+def run_batch(lines, workers=BATCH_WORKERS):
+    parsed = [(i, line) + extract_batch_line(line) for i, line in enumerate(lines)]
+
+    # Scrape each distinct (item, budget) once. Connectors return only their top few results under
+    # the budget, so a scrape at a higher budget could leave a cheaper line with nothing.
+    scrape_keys = {
+        ((vendor_item(context) or "").lower(), context["budget"])
+        for _, _, _, context in parsed if context["item"] and context["budget"]
+    }
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Scrapes are queued before the lines that wait on them, so the pool cannot deadlock
+        scrapes = {key: pool.submit(search_vendors, *key) for key in scrape_keys}
+
+        def run_line(index, line, quantity, context):
+            key = ((vendor_item(context) or "").lower(), context["budget"])
+            return process_batch_line(index, line, quantity, context, scrapes[key].result() if key in scrapes else None)
+
+        futures = [pool.submit(run_line, *entry) for entry in parsed]
+        for future in as_completed(futures):
+            yield future.result()
+
+@app.route('/api/batch', methods=['POST'])
+def submit_batch():
+    payload = request.get_data(as_text=True)
+    content_type = request.content_type or ""
+    if request.is_json and payload.lstrip().startswith("{"):
+        lines = [batch_entry_text(line) for line in (request.get_json().get("lines") or []) if batch_entry_text(line)]
+    elif request.is_json and payload.lstrip().startswith("["):
+        lines = [batch_entry_text(line) for line in request.get_json() if batch_entry_text(line)]
+    else:
+        lines = parse_batch_payload(payload, content_type)
+    if not lines:
+        return jsonify({"error": "No batch lines found. Send CSV, JSONL, a JSON list, or {\"lines\": [...]}."}), 400
+
+    def stream():
+        started = time.time()
+        completed = 0
+        for result in run_batch(lines):
+            completed += 1
+            if request_logger:
+                request_logger.log({
+                    "kind": "batch",
+                    "input": result["request"],
+                    "context": result["context"],
+                    "candidates": [{"title": p["title"], "price": p["price"], "match_score": p["match_score"]} for p in result.get("products", [])],
+                    "timings": {"total_ms": result["elapsed_ms"]}
+                })
+            yield json.dumps(result) + "\n"
+        elapsed = time.time() - started
+        yield json.dumps({"summary": {
+            "lines": completed,
+            "elapsed_s": round(elapsed, 3),
+            "lines_per_s": round(completed / elapsed, 2) if elapsed else None
+        }}) + "\n"
+
+    return Response(stream_with_context(stream()), mimetype="application/x-ndjson")
+
+# Prefetch candidate lists for the most popular historical queries without delaying startup
+warmer = start_warmup(search_vendors, lookup=cached_vendor_results)
+
+@app.route('/api/warmup', methods=['GET'])
+def get_warmup_report():
+    return jsonify(warmer.report if warmer else {"status": "disabled"})
+
+@app.route('/api/suggest', methods=['GET'])
+def get_suggestions():
+    catalog.refresh()  # Listeners re-rank the changed terms
+    query = request.args.get("q", "")
+    if not query.strip():
+        return jsonify({"query": query, "suggestions": []})
+    return jsonify({"query": query, "suggestions": suggestions.suggest(query, request.args.get("limit", type=int))})
+
+@app.route('/api/facets', methods=['GET'])
+def get_facets():
+    if index_loader.is_alive():
+        return jsonify({"error": "Catalog facets are still loading, try again shortly."}), 503
+    catalog.refresh()  # Listeners fold in SKU changes from other workers
+    item = request.args.get("item", "").strip()
+    budget = request.args.get("budget", type=float)
+    return jsonify(facet_index.facets(normalizer.normalize(item) if item else None, budget))
+
+@app.route('/api/vendors', methods=['GET'])
+def get_vendor_status():
+    return jsonify(vendor_status())
+
+def admin_authorized():
+    token = os.getenv("ADMIN_TOKEN")
+    return bool(token) and request.headers.get("X-Admin-Token") == token
+
+@app.route('/api/admin/catalog', methods=['POST'])
+def update_catalog():
+    if not admin_authorized():
+        return jsonify({"error": "Admin token missing or invalid"}), 403
+    data = request.get_json() or {}
+    try:
+        result = catalog.update(upserts=data.get("upserts", []), deletes=data.get("deletes", []))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
+
+@app.route('/api/admin/catalog/compact', methods=['POST'])
+def compact_catalog():
+    if not admin_authorized():
+        return jsonify({"error": "Admin token missing or invalid"}), 403
+    return jsonify(catalog.compact())
+
 @app.route('/api/approval', methods=['POST'])
 def send_approval():
     data = request.get_json()
@@ -0,0 +1,201 @@
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+from email.mime.text import MIMEText
+
+
+class ApprovalDispatcher:
+    # Persists approval emails in chatbot.db and sends them from a background thread
+    # over one reused SMTP connection. With digest=True, requests for the same approver
+    # that arrive within digest_window seconds are batched into a single email.
+    def __init__(self, db_path="chatbot.db", host="smtp.gmail.com", port=587, user=None, password=None,
+                 sender=None, starttls=True, digest=False, digest_window=300, max_attempts=5, poll_interval=1.0, claim_timeout=300):
+        self.db_path = db_path
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.sender = sender or user or "procurement-assistant@localhost"
+        self.starttls = starttls
+        self.digest = digest
+        self.digest_window = digest_window
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        self.stats = {"sent": 0, "emails": 0, "failed": 0, "retries": 0, "last_send_ms": None, "avg_send_ms": None, "avg_wait_s": None}
+        self._server = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS approval_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, approver TEXT, subject TEXT, body TEXT, product_id TEXT,
+                status TEXT DEFAULT 'pending', attempts INTEGER DEFAULT 0, last_error TEXT,
+                created_at REAL, next_attempt_at REAL, sent_at REAL)""")
+        self._release_stale_claims()
+        self._thread = threading.Thread(target=self._run, name="approval-dispatcher", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def enqueue(self, approver, subject, body, product_id=None):
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO approval_queue (approver, subject, body, product_id, created_at, next_attempt_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (approver, subject, body, product_id, now, now))
+        self._wake.set()
+        return cursor.lastrowid
+
+    def queue_depth(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM approval_queue WHERE status = 'pending'").fetchone()[0]
+
+    def snapshot(self):
+        return dict(self.stats, queue_depth=self.queue_depth())
+
+    def _smtp(self):
+        # Reuse the authenticated connection while the server still answers NOOP
+        if self._server is not None:
+            try:
+                if self._server.noop()[0] == 250:
+                    return self._server
+            except smtplib.SMTPException:
+                pass
+            self._close_smtp()
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.starttls:
+            server.starttls()
+        server.ehlo_or_helo_if_needed()
+        # Local stand-ins (aiosmtpd, smtpd) don't offer AUTH; logging in there would fail every send
+        if self.user and self.password and server.has_extn("auth"):
+            server.login(self.user, self.password)
+        self._server = server
+        return server
+
+    def _close_smtp(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+    def _release_stale_claims(self):
+        # Rows claimed by a process that died mid-send go back to the queue once the claim expires
+        with self._connect() as conn:
+            conn.execute("UPDATE approval_queue SET status = 'pending' WHERE status = 'sending' AND next_attempt_at <= ?", (time.time(),))
+
+    def _claim(self, batch):
+        # Every Streamlit process runs a dispatcher on the same database; only the one whose
+        # UPDATE flips all rows from pending to sending may send them
+        ids = [row[0] for row in batch]
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE approval_queue SET status = 'sending', next_attempt_at = ? WHERE id IN ({','.join('?' * len(ids))}) AND status = 'pending'",
+                [time.time() + self.claim_timeout] + ids)
+            if cursor.rowcount != len(ids):
+                conn.rollback()  # Another dispatcher got there first
+                return False
+        return True
+
+    def _due_batches(self):
+        self._release_stale_claims()
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, approver, subject, body, created_at, attempts FROM approval_queue WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY id",
+                (now,)).fetchall()
+        if not self.digest:
+            return [[row] for row in rows]
+        by_approver = {}
+        for row in rows:
+            by_approver.setdefault(row[1], []).append(row)
+        # Hold a digest open until its oldest request has waited digest_window seconds
+        return [group for group in by_approver.values() if now - group[0][4] >= self.digest_window]
+
+    def _message(self, batch):
+        if len(batch) == 1:
+            subject, body = batch[0][2], batch[0][3]
+        else:
+            subject = f"Approval Digest: {len(batch)} requests awaiting approval"
+            body = "\n\n".join(f"Request {i} of {len(batch)}: {row[2]}\n{row[3]}" for i, row in enumerate(batch, 1))
+        msg = MIMEText(body)
+        msg["Subject"] = subject
+        msg["From"] = self.sender
+        msg["To"] = batch[0][1]
+        return msg
+
+    def _send(self, batch):
+        ids = [row[0] for row in batch]
+        placeholders = ",".join("?" * len(ids))
+        started = time.time()
+        try:
+            try:
+                self._smtp().send_message(self._message(batch))
+            except smtplib.SMTPServerDisconnected:
+                self._close_smtp()
+                self._smtp().send_message(self._message(batch))
+        except Exception as e:
+            self._close_smtp()
+            attempts = max(row[5] for row in batch) + 1
+            status = "failed" if attempts >= self.max_attempts else "pending"
+            with self._connect() as conn:
+                conn.execute(
+                    f"UPDATE approval_queue SET attempts = ?, status = ?, last_error = ?, next_attempt_at = ? WHERE id IN ({placeholders})",
+                    [attempts, status, str(e), time.time() + 2 ** attempts] + ids)
+            self.stats["retries" if status == "pending" else "failed"] += len(batch)
+            print(f"Approval email to {batch[0][1]} failed (attempt {attempts}): {str(e)}")
+            return
+
+        sent_at = time.time()
+        with self._connect() as conn:
+            conn.execute(f"UPDATE approval_queue SET status = 'sent', sent_at = ? WHERE id IN ({placeholders})", [sent_at] + ids)
+        send_ms = (sent_at - started) * 1000
+        wait_s = sum(sent_at - row[4] for row in batch) / len(batch)
+        emails = self.stats["emails"]
+        self.stats["last_send_ms"] = round(send_ms, 1)
+        self.stats["avg_send_ms"] = round(((self.stats["avg_send_ms"] or 0) * emails + send_ms) / (emails + 1), 1)
+        self.stats["avg_wait_s"] = round(((self.stats["avg_wait_s"] or 0) * emails + wait_s) / (emails + 1), 2)
+        self.stats["emails"] += 1
+        self.stats["sent"] += len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                for batch in self._due_batches():
+                    if self._claim(batch):
+                        self._send(batch)
+            except Exception as e:
+                print(f"Approval dispatcher error: {str(e)}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+        self._close_smtp()
+
+    def close(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+
+def smtp_auth_enabled():
+    # SMTP_AUTH=off sends without credentials, e.g. to a local SMTP stand-in
+    return os.getenv("SMTP_AUTH", "on").lower() not in ["0", "off", "false"]
+
+
+def create_approval_dispatcher(user, password, sender=None):
+    if not smtp_auth_enabled():
+        user, password = None, None
+    return ApprovalDispatcher(
+        db_path=os.getenv("APPROVAL_DB", "chatbot.db"),
+        host=os.getenv("SMTP_HOST", "smtp.gmail.com"),
+        port=int(os.getenv("SMTP_PORT", "587")),
+        user=user,
+        password=password,
+        sender=sender,
+        starttls=os.getenv("SMTP_STARTTLS", "on").lower() not in ["0", "off", "false"],
+        digest=os.getenv("APPROVAL_DIGEST", "off").lower() in ["1", "on", "true"],
+        digest_window=float(os.getenv("APPROVAL_DIGEST_WINDOW", "300"))
+    )
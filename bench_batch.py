@@ -0,0 +1,30 @@
+import sys
+import time
+import vendors
+from app import parse_batch_payload, extract_batch_line, process_batch_line, run_batch
+
+# Compares /api/batch processing against running every line through the single-request path.
+# Batch lines share a scrape only when both item and budget match, so results are the same.
+def run_sequential(lines):
+    results = []
+    for i, line in enumerate(lines):
+        quantity, context = extract_batch_line(line)
+        results.append(process_batch_line(i, line, quantity, context))
+    return results
+
+def timed(label, fn, lines):
+    started = time.time()
+    results = list(fn(lines))
+    elapsed = time.time() - started
+    found = sum(1 for r in results if r.get("best_product"))
+    print(f"{label:<12} {len(results)} lines in {elapsed:.2f}s ({len(results) / elapsed:.2f} lines/s, {found} with a best product)")
+    return elapsed
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "sample_batch.csv"
+    with open(path, "r") as f:
+        lines = parse_batch_payload(f.read(), "text/csv")
+    sequential = timed("sequential", run_sequential, lines)
+    vendors._cache.clear()  # Otherwise the batch run is served from what the sequential run cached
+    batched = timed("batch", run_batch, lines)
+    print(f"Speedup: {sequential / batched:.1f}x")
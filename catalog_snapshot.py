@@ -0,0 +1,162 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from product_identity import LOCAL_VENDOR, stable_product_id
+
+# Binary catalog snapshot layout (native byte order, compiled per node):
+#   header      magic, product count, category count
+#   prices      float64[count]
+#   categories  uint16[count]        index into the category table
+#   cat table   uint32[ncat][2]      (offset, length) into the string heap
+#   fields      uint32[count][F][2]  (offset, length) into the string heap
+#   heap        utf-8 strings, deduplicated
+MAGIC = b"CATSNAP1"
+HEADER = struct.Struct("=8sII")
+FIELDS = ["title", "description", "availability", "delivery_time", "link", "product_id"]
+
+
+def _align(offset, size):
+    return (offset + size - 1) // size * size
+
+
+def compile_snapshot(products, path):
+    heap = bytearray()
+    interned = {}
+
+    def intern(text):
+        text = "" if text is None else str(text)
+        if text not in interned:
+            data = text.encode("utf-8")
+            interned[text] = (len(heap), len(data))
+            heap.extend(data)
+        return interned[text]
+
+    categories = []
+    category_index = {}
+    prices = array("d")
+    category_ids = array("H")
+    refs = array("I")
+    for p in products:
+        category = p.get("category", "")
+        if category not in category_index:
+            category_index[category] = len(categories)
+            categories.append(category)
+        prices.append(float(p["price"]))
+        category_ids.append(category_index[category])
+        p = dict(p, product_id=p.get("product_id") or stable_product_id(p["title"], p.get("vendor", LOCAL_VENDOR), p.get("link")))
+        for field in FIELDS:
+            refs.extend(intern(p.get(field)))
+
+    category_refs = array("I")
+    for category in categories:
+        category_refs.extend(intern(category))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(prices), len(categories)))
+        f.write(prices.tobytes())
+        f.write(category_ids.tobytes())
+        f.write(b"\0" * (_align(f.tell(), 4) - f.tell()))
+        f.write(category_refs.tobytes())
+        f.write(refs.tobytes())
+        f.write(heap)
+    os.replace(tmp_path, path)  # Readers never see a partially written snapshot
+    return len(prices)
+
+
+class CatalogSnapshot:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, ncat = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+
+        view = memoryview(self._mm)
+        offset = HEADER.size
+        self.prices = view[offset:offset + 8 * self.count].cast("d")
+        offset += 8 * self.count
+        self._category_ids = view[offset:offset + 2 * self.count].cast("H")
+        offset = _align(offset + 2 * self.count, 4)
+        category_refs = view[offset:offset + 8 * ncat].cast("I")
+        offset += 8 * ncat
+        self._refs = view[offset:offset + 8 * len(FIELDS) * self.count].cast("I")
+        offset += 8 * len(FIELDS) * self.count
+        self._heap = view[offset:]
+        self.categories = [self._string(category_refs, i) for i in range(ncat)]
+
+    def _string(self, refs, slot):
+        start, length = refs[2 * slot], refs[2 * slot + 1]
+        return str(self._heap[start:start + length], "utf-8")
+
+    def field(self, index, name):
+        return self._string(self._refs, index * len(FIELDS) + FIELDS.index(name))
+
+    def product(self, index):
+        base = index * len(FIELDS)
+        p = {field: self._string(self._refs, base + i) for i, field in enumerate(FIELDS)}
+        p["price"] = self.prices[index]
+        p["category"] = self.categories[self._category_ids[index]]
+        p["vendor"] = LOCAL_VENDOR
+        return p
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.product(index)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.product(i)
+
+    def search(self, item, budget, predicate=None, limit=None):
+        # Filter on the price column and title heap first; only matches become dicts
+        item = item.lower()
+        title_slot = FIELDS.index("title")
+        results = []
+        for i in range(self.count):
+            if self.prices[i] > budget:
+                continue
+            if item not in self._string(self._refs, i * len(FIELDS) + title_slot).lower():
+                continue
+            p = self.product(i)
+            if predicate and not predicate(p):
+                continue
+            results.append(p)
+            if limit and len(results) >= limit:
+                break
+        return results
+
+
+def search_catalog(catalog, item, budget, predicate=None, limit=None):
+    if hasattr(catalog, "search"):
+        return catalog.search(item, budget, predicate, limit)
+    results = [
+        p for p in catalog
+        if p["price"] <= budget and item.lower() in p["title"].lower() and (predicate(p) if predicate else True)
+    ]
+    return results[:limit] if limit else results
+
+
+def load_catalog(snapshot_path="catalog.bin", json_path="catalog.json"):
+    # Prefer the mmap snapshot; recompile it when catalog.json is newer
+    if os.path.exists(json_path):
+        if not os.path.exists(snapshot_path) or os.path.getmtime(snapshot_path) < os.path.getmtime(json_path):
+            with open(json_path, "r") as f:
+                compile_snapshot(json.load(f), snapshot_path)
+    return CatalogSnapshot(snapshot_path)
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "catalog.json"
+    target = sys.argv[2] if len(sys.argv) > 2 else "catalog.bin"
+    with open(source, "r") as f:
+        count = compile_snapshot(json.load(f), target)
+    print(f"Compiled {count} products from {source} into {target} ({os.path.getsize(target)} bytes).")
@@ -0,0 +1,324 @@
+import fcntl
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+from catalog_snapshot import CatalogSnapshot, compile_snapshot, search_catalog
+from product_identity import LOCAL_VENDOR, stable_product_id
+
+
+@contextmanager
+def _file_lock(path, mode):
+    # flock on a sidecar file, so the journal itself can be replaced while processes wait on the lock
+    with open(path, "a") as f:
+        fcntl.flock(f.fileno(), mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class CatalogView:
+    # Immutable state of the catalog: a base (snapshot or list) plus an overlay of changed
+    # products and a set of deleted ids. Writers build a new view and swap it in, so a reader
+    # that grabbed a view keeps seeing one consistent version. base_index maps product ids to
+    # base positions; an updated product keeps its base position, new products follow the base.
+    def __init__(self, base, overlay, deleted, version, base_index=None):
+        self.base = base
+        self.overlay = overlay
+        self.deleted = deleted
+        self.version = version
+        self.base_index = base_index or {}
+
+    def _visible_in_base(self, p):
+        return p.get("product_id") not in self.overlay and p.get("product_id") not in self.deleted
+
+    def _position(self, p):
+        return self.base_index.get(p.get("product_id"), len(self.base))
+
+    def search(self, item, budget, predicate=None, limit=None):
+        base_predicate = (lambda p: self._visible_in_base(p) and predicate(p)) if predicate else self._visible_in_base
+        results = search_catalog(self.base, item, budget, base_predicate, limit)
+        updated = search_catalog(list(self.overlay.values()), item, budget, predicate) if self.overlay else []
+        if not updated:
+            return results
+        # results are the first base matches in base order, so merging by position keeps the first `limit` overall
+        results = sorted(results + [dict(p) for p in updated], key=self._position)
+        return results[:limit] if limit else results
+
+    def __iter__(self):
+        for p in self.base:
+            product_id = p.get("product_id")
+            if product_id in self.deleted:
+                continue
+            yield self.overlay.get(product_id, p)
+        for product_id, p in self.overlay.items():
+            if product_id not in self.base_index:
+                yield p
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class CatalogStore:
+    # Applies SKU upserts and deletes without a restart. Changes are journaled to
+    # catalog_updates.jsonl so they survive restarts and reach other processes via refresh().
+    # Appends and compaction hold an exclusive flock on <journal>.lock; compaction starts a new
+    # journal whose first line names its generation, which tells readers to reload the snapshot.
+    def __init__(self, base, journal_path="catalog_updates.jsonl", snapshot_path=None):
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path or getattr(base, "path", None)
+        self.view = CatalogView(base, {}, frozenset(), 0)
+        self._base_index = None
+        self._journal_offset = 0
+        self._journal_stat = None
+        self._journal_generation = None
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def subscribe(self, listener, reset=None):
+        # listener(removed, added) runs after every applied change, e.g. to maintain search indexes.
+        # reset(products), if given, runs instead when the whole catalog is reloaded after a
+        # compaction, so an index rebuilds once rather than removing and re-adding every product.
+        self._listeners.append((listener, reset))
+
+    def attach(self, *indexes):
+        # Loads indexes (anything with load(products) and apply(removed, added)) from one pass
+        # over the catalog and subscribes them. The lock is only held to list the products;
+        # changes published while the indexes load are queued and applied once they are done.
+        backlog = []
+        ready = []
+
+        def apply(removed, added):
+            if not ready:
+                backlog.append((removed, added))
+                return
+            for index in indexes:
+                index.apply(removed, added)
+
+        def reset(products):
+            if not ready:
+                backlog[:] = [(None, products)]  # A reload replaces everything queued before it
+                return
+            for index in indexes:
+                index.load(products)
+
+        with self._lock:
+            products = list(self.view)
+            self.subscribe(apply, reset)
+        for index in indexes:
+            index.load(products)
+        with self._lock:
+            for removed, added in backlog:
+                for index in indexes:
+                    if removed is None:
+                        index.load(added)
+                    else:
+                        index.apply(removed, added)
+            ready.append(True)
+
+    def search(self, item, budget, predicate=None, limit=None):
+        return self.view.search(item, budget, predicate, limit)
+
+    def __iter__(self):
+        return iter(self.view)
+
+    def __len__(self):
+        return len(self.view)
+
+    def get(self, product_id, view=None):
+        view = view or self.view
+        if product_id in view.deleted:
+            return None
+        if product_id in view.overlay:
+            return view.overlay[product_id]
+        if self._base_index is None:
+            self._base_index = {p.get("product_id"): i for i, p in enumerate(view.base)}
+        index = self._base_index.get(product_id)
+        return view.base[index] if index is not None else None
+
+    def _normalize_upsert(self, change, view):
+        product_id = change.get("product_id")
+        if not product_id:
+            if not change.get("title"):
+                raise ValueError("Upserts need a product_id or a title.")
+            product_id = stable_product_id(change["title"], change.get("vendor", LOCAL_VENDOR), change.get("link"))
+        existing = self.get(product_id, view)
+        product = dict(existing or {})
+        product.update(change)
+        product["product_id"] = product_id
+        for field in ["title", "price"]:
+            if field not in product:
+                raise ValueError(f"New product {product_id} is missing '{field}'.")
+        product["price"] = float(product["price"])
+        if product["price"] < 0:
+            raise ValueError(f"Product {product_id} has a negative price.")
+        product.setdefault("vendor", LOCAL_VENDOR)
+        for field, default in [("description", ""), ("availability", "Check site"), ("delivery_time", "Varies"), ("category", ""), ("link", "#")]:
+            product.setdefault(field, default)
+        return existing, product
+
+    def _apply(self, entries, view):
+        # entries are journal records, applied in order: {"op": "upsert", "product": {...}} or {"op": "delete", "product_id": ...}
+        overlay = dict(view.overlay)
+        deleted = set(view.deleted)
+        working = CatalogView(view.base, overlay, deleted, view.version, view.base_index)
+        removed, added, applied = [], [], []
+        for entry in entries:
+            if entry["op"] == "upsert":
+                existing, product = self._normalize_upsert(entry["product"], working)
+                if existing:
+                    removed.append(existing)
+                overlay[product["product_id"]] = product
+                deleted.discard(product["product_id"])
+                added.append(product)
+                applied.append({"op": "upsert", "product": product})
+            elif entry["op"] == "delete":
+                existing = self.get(entry["product_id"], working)
+                if existing is None:
+                    continue
+                overlay.pop(entry["product_id"], None)
+                deleted.add(entry["product_id"])
+                removed.append(existing)
+                applied.append({"op": "delete", "product_id": entry["product_id"]})
+            else:
+                raise ValueError(f"Unknown catalog operation: {entry['op']}")
+        return CatalogView(view.base, overlay, frozenset(deleted), view.version + 1, self._base_index), removed, added, applied
+
+    def _publish(self, new_view, removed, added):
+        self.view = new_view  # Single reference swap: readers see the old or the new version, never a mix
+        for listener, _ in self._listeners:
+            listener(removed, added)
+
+    def update(self, upserts=(), deletes=()):
+        with self._lock, self._journal_lock(fcntl.LOCK_EX):
+            self.refresh(locked=True)
+            entries = [{"op": "upsert", "product": p} for p in upserts] + [{"op": "delete", "product_id": i} for i in deletes]
+            new_view, removed, added, applied = self._apply(entries, self.view)
+            if applied and self.journal_path:
+                # Journal first, then replay it: entries appended by other processes are picked up in order too
+                with open(self.journal_path, "a+", encoding="utf-8") as f:
+                    if f.tell() and not self._ends_with_newline():
+                        f.write("\n")  # Close off a record torn by a writer that died mid-append
+                    f.write("".join(json.dumps(entry) + "\n" for entry in applied))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.refresh(locked=True)
+            else:
+                self._publish(new_view, removed, added)
+            return {"version": self.view.version, "upserted": len(added), "deleted": len(applied) - len(added)}
+
+    def _ends_with_newline(self):
+        with open(self.journal_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @contextmanager
+    def _journal_lock(self, mode):
+        if not self.journal_path:
+            yield
+            return
+        with _file_lock(f"{self.journal_path}.lock", mode):
+            yield
+
+    def refresh(self, locked=False):
+        # Replays journal entries written since the last call (by this or another process).
+        # locked=True means the caller holds both the thread lock and the journal lock.
+        if not self.journal_path or not os.path.exists(self.journal_path):
+            return
+        if not locked:
+            if self._journal_changed():
+                with self._lock, self._journal_lock(fcntl.LOCK_SH):
+                    self._replay()
+            return
+        if self._journal_changed():
+            self._replay()
+
+    def _journal_changed(self):
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns) != self._journal_stat
+
+    def _replay(self):
+        stat = os.stat(self.journal_path)
+        with open(self.journal_path, "rb") as f:
+            header = f.readline()
+            generation = self._generation_of(header)
+            if generation != self._journal_generation:
+                if generation is not None or self._journal_stat is not None:
+                    self._reload_base()  # Another process compacted the journal into a new snapshot
+                self._journal_generation = generation
+                self._journal_offset = len(header) if generation else 0
+            f.seek(self._journal_offset)
+            data = f.read()
+        # A writer that died mid-append leaves a partial last line; it is read once it ends in a newline
+        end = data.rfind(b"\n") + 1
+        entries = []
+        for line in data[:end].decode("utf-8", errors="replace").splitlines():
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                print(f"Skipping a torn catalog journal record: {line[:80]}")
+        self._journal_offset += end
+        self._journal_stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if entries:
+            new_view, removed, added, _ = self._apply(entries, self.view)
+            self._publish(new_view, removed, added)
+
+    @staticmethod
+    def _generation_of(header):
+        # Journals written before compaction existed have no header line
+        if not header.endswith(b"\n"):
+            return None
+        try:
+            entry = json.loads(header)
+        except ValueError:
+            return None
+        return entry.get("generation") if isinstance(entry, dict) and entry.get("op") == "generation" else None
+
+    def _reload_base(self):
+        base = CatalogSnapshot(self.snapshot_path) if self.snapshot_path else self.view.base
+        self._base_index = None
+        self._journal_offset = 0
+        old_view = self.view
+        self.view = CatalogView(base, {}, frozenset(), old_view.version + 1)
+        products = list(base)
+        for listener, reset in self._listeners:
+            if reset:
+                reset(products)
+            else:
+                listener(list(old_view), products)
+
+    def compact(self):
+        # Folds the journal into a fresh snapshot so the overlay and journal start empty again
+        if not self.snapshot_path:
+            raise ValueError("Compaction needs a snapshot path.")
+        with self._lock, self._journal_lock(fcntl.LOCK_EX):
+            self.refresh(locked=True)
+            compile_snapshot(list(self.view), self.snapshot_path)
+            base = CatalogSnapshot(self.snapshot_path)
+            if self.journal_path:
+                # A new file under a new generation rather than a truncate, so workers still
+                # holding an offset into the old journal notice and reload the snapshot
+                generation = uuid.uuid4().hex
+                header = (json.dumps({"op": "generation", "generation": generation}) + "\n").encode("utf-8")
+                tmp_path = f"{self.journal_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(header)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.journal_path)
+                stat = os.stat(self.journal_path)
+                self._journal_generation = generation
+                self._journal_offset = len(header)
+                self._journal_stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            self._base_index = None
+            self.view = CatalogView(base, {}, frozenset(), self.view.version + 1)
+            return {"version": self.view.version, "products": base.count}
@@ -0,0 +1,94 @@
+import re
+
+# Slot name used when every missing slot is asked for in a single turn
+MULTI_SLOT = "all"
+
+# Slots that fall back to a default instead of blocking the search after a multi-slot reply
+OPTIONAL_SLOT_DEFAULTS = {
+    "purpose": "General use",
+    "brand": "No preference",
+    "features": "No specific features",
+    "urgency": "No rush"
+}
+
+KNOWN_BRANDS = ["Steelcase", "Herman Miller", "IKEA", "Logitech", "Razer", "Dell", "Samsung", "Apple", "Lenovo", "Uplift"]
+FEATURE_KEYWORDS = ["ergonomic", "lumbar support", "adjustable height", "mesh", "reclining", "portable", "wireless", "mechanical", "RGB", "backlit"]
+
+BUDGET_PATTERN = re.compile(r"(?:\$\s*(\d+(?:\.\d+)?)|(\d+(?:\.\d+)?)\s*(?:dollars|usd|bucks)\b|(?:budget|under|below|less than|around|about|max|up to)\s*(?:of|is)?\s*\$?\s*(\d+(?:\.\d+)?))", re.IGNORECASE)
+URGENCY_PATTERN = re.compile(r"\b(?:within|by|in \d|asap|as soon as possible|urgent|urgently|soon|today|tomorrow|next week|this week|no rush|no hurry|whenever|days?|weeks?|months?)\b", re.IGNORECASE)
+NO_BRAND_PATTERN = re.compile(r"\b(?:no|any|don'?t care about|without a?)\s*(?:specific |particular )?brand(?: preference)?s?\b|\bbrand doesn'?t matter\b", re.IGNORECASE)
+BRAND_PATTERN = re.compile(r"\b(?:brand|prefer|from|by)\s*(?:is|:)?\s*([A-Z][\w&\- ]+)", re.IGNORECASE)
+PURPOSE_PATTERN = re.compile(r"^\s*(?:it'?s |mainly |mostly )?(?:for|to use for|used for|use for)\s+(.+)$", re.IGNORECASE)
+BARE_NUMBER_PATTERN = re.compile(r"^\$?\s*(\d+(?:\.\d+)?)$")
+FEATURES_PATTERN = re.compile(r"^\s*(?:need|needs|must have|with|want|should have|features?:?)\s+(.+)$", re.IGNORECASE)
+FILLER_WORDS = {"i", "it", "one", "this", "that", "something", "ok", "okay"}
+
+
+def generate_multi_slot_question(missing_slots, item, question_fn):
+    subject = f"the {item}" if item else "your purchase"
+    lines = [f"To find the best option for {subject}, please answer these in one reply (skip anything you don't mind):"]
+    for slot in missing_slots:
+        lines.append(f"- {question_fn(slot, item)}")
+    lines.append('For example: "around $300, for home office, no brand preference, need lumbar support, within a week".')
+    return "\n".join(lines)
+
+
+def clarification_prompt(missing_slots, item, mode, question_fn):
+    if mode == "multi":
+        return generate_multi_slot_question(missing_slots, item, question_fn), MULTI_SLOT
+    return question_fn(missing_slots[0], item), missing_slots[0]
+
+
+def parse_multi_slot_reply(user_input, missing_slots):
+    values = {}
+    leftovers = []
+    # Split on punctuation and before words that start a new answer ("for gaming and need RGB by friday")
+    for segment in re.split(r"[,;\n]+|\s+(?:and\s+)?(?=(?:for|need|with|within|by|no|any)\s|in\s+\d)", user_input):
+        segment = segment.strip(" .")
+        if not segment or segment.lower() in FILLER_WORDS:
+            continue
+        budget_match = BUDGET_PATTERN.search(segment)
+        purpose_match = PURPOSE_PATTERN.match(segment)
+        features_match = FEATURES_PATTERN.match(segment)
+        if features_match and features_match.group(1).strip().lower() in FILLER_WORDS:
+            continue
+        bare_number = BARE_NUMBER_PATTERN.match(segment)
+        if "budget" not in values and budget_match:
+            values["budget"] = float(next(g for g in budget_match.groups() if g))
+            # The rest of the segment can still say when ("by friday under 200")
+            rest = (segment[:budget_match.start()] + segment[budget_match.end():]).strip(" .")
+            if "urgency" not in values and rest and URGENCY_PATTERN.search(rest) and not PURPOSE_PATTERN.match(rest):
+                values["urgency"] = rest
+        elif "budget" not in values and "budget" in missing_slots and bare_number:
+            values["budget"] = float(bare_number.group(1))  # "300" is the usual answer to the budget question
+        elif "brand" not in values and NO_BRAND_PATTERN.search(segment):
+            values["brand"] = OPTIONAL_SLOT_DEFAULTS["brand"]
+        elif "brand" not in values and any(b.lower() in segment.lower() for b in KNOWN_BRANDS):
+            values["brand"] = next(b for b in KNOWN_BRANDS if b.lower() in segment.lower())
+        elif "urgency" not in values and URGENCY_PATTERN.search(segment) and not purpose_match:
+            values["urgency"] = segment
+        elif "purpose" not in values and purpose_match:
+            values["purpose"] = purpose_match.group(1).strip()
+        elif "features" not in values and (features_match or any(f.lower() in segment.lower() for f in FEATURE_KEYWORDS)):
+            values["features"] = features_match.group(1).strip() if features_match else segment
+        elif "brand" not in values and BRAND_PATTERN.search(segment):
+            values["brand"] = BRAND_PATTERN.search(segment).group(1).strip()
+        else:
+            leftovers.append(segment)
+
+    # Unlabelled answers fill the remaining free-text slots in the order they were asked
+    for slot in [s for s in missing_slots if s not in values and s != "budget"]:
+        if not leftovers:
+            break
+        values[slot] = leftovers.pop(0)
+    return {slot: value for slot, value in values.items() if slot in missing_slots}
+
+
+def apply_optional_defaults(context):
+    for slot, default in OPTIONAL_SLOT_DEFAULTS.items():
+        if context.get(slot) is None:
+            context[slot] = default
+
+
+def is_default(slot, value):
+    return value == OPTIONAL_SLOT_DEFAULTS.get(slot)
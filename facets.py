@@ -0,0 +1,167 @@
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+FACET_FIELDS = ["category", "availability", "delivery_time"]
+PERCENTILES = [10, 25, 50, 75, 90]
+HISTOGRAM_BINS = 10
+MIN_HINT_PRODUCTS = 5
+WORD_PATTERN = re.compile(r"[a-z]+")
+ALL_PRODUCTS = ""  # Group key for the whole catalog; title words are never empty
+
+
+def title_words(product):
+    return {w for w in WORD_PATTERN.findall((product.get("title") or "").lower()) if len(w) > 2}
+
+
+def _remove(prices, price):
+    index = bisect_left(prices, price)
+    if index < len(prices) and prices[index] == price:
+        del prices[index]
+
+
+class _Group:
+    # Sorted prices for a set of products, overall and per facet value, so any budget cut is a bisect
+    __slots__ = ("prices", "fields")
+
+    def __init__(self):
+        self.prices = array("d")
+        self.fields = {field: {} for field in FACET_FIELDS}
+
+    def add(self, product):
+        insort(self.prices, product["price"])
+        for field in FACET_FIELDS:
+            insort(self.fields[field].setdefault(product.get(field) or "Unknown", array("d")), product["price"])
+
+    def remove(self, product):
+        _remove(self.prices, product["price"])
+        for field in FACET_FIELDS:
+            values = self.fields[field]
+            value = product.get(field) or "Unknown"
+            if value in values:
+                _remove(values[value], product["price"])
+                if not values[value]:
+                    del values[value]
+
+
+class FacetIndex:
+    # Category, price, availability and delivery aggregates kept up to date as the catalog
+    # changes. Products are grouped by whole title word, so an item filter picks a group instead
+    # of scanning. This is not the substring match search uses: "key" finds no group although
+    # search matches "Keyboard", and "chair" leaves out "Armchair". For multi-word items the
+    # group of the rarest word is used, which also counts titles that don't contain the whole phrase.
+    def __init__(self):
+        self.groups = {ALL_PRODUCTS: _Group()}
+        self._lock = threading.Lock()
+
+    def load(self, products):
+        # Bulk load: append everything, then sort each price list once
+        raw = {}
+        for p in products:
+            for key in [ALL_PRODUCTS] + sorted(title_words(p)):
+                group = raw.setdefault(key, {"prices": [], "fields": {field: {} for field in FACET_FIELDS}})
+                group["prices"].append(p["price"])
+                for field in FACET_FIELDS:
+                    group["fields"][field].setdefault(p.get(field) or "Unknown", []).append(p["price"])
+        groups = {ALL_PRODUCTS: _Group()}
+        for key, values in raw.items():
+            group = groups.setdefault(key, _Group())
+            group.prices = array("d", sorted(values["prices"]))
+            group.fields = {field: {v: array("d", sorted(prices)) for v, prices in by_value.items()} for field, by_value in values["fields"].items()}
+        with self._lock:
+            self.groups = groups
+        return self
+
+    def apply(self, removed, added):
+        # CatalogStore listener: each changed product touches only its own groups
+        with self._lock:
+            for p in removed:
+                for key in [ALL_PRODUCTS] + list(title_words(p)):
+                    group = self.groups.get(key)
+                    if group is not None:
+                        group.remove(p)
+                        if key != ALL_PRODUCTS and not group.prices:
+                            del self.groups[key]
+            for p in added:
+                for key in [ALL_PRODUCTS] + list(title_words(p)):
+                    self.groups.setdefault(key, _Group()).add(p)
+
+    def _group_for(self, item, relaxed=False):
+        # relaxed ignores words no title uses ("office chair" -> chair), which suits hints but not filters
+        if not item:
+            return self.groups[ALL_PRODUCTS]
+        groups = [self.groups.get(word) for word in title_words({"title": item})]
+        if relaxed:
+            groups = [group for group in groups if group is not None]
+        if not groups or any(group is None for group in groups):
+            return None
+        return min(groups, key=lambda group: len(group.prices))
+
+    def facets(self, item=None, budget=None):
+        with self._lock:
+            group = self._group_for(item)
+            if group is None:
+                return {"item": item, "budget": budget, "count": 0, "price": price_summary(array("d"), 0),
+                        **{field: {} for field in FACET_FIELDS}}
+            limit = bisect_right(group.prices, budget) if budget is not None else len(group.prices)
+            result = {"item": item, "budget": budget, "count": limit, "price": price_summary(group.prices, limit)}
+            for field in FACET_FIELDS:
+                counts = {
+                    value: bisect_right(prices, budget) if budget is not None else len(prices)
+                    for value, prices in group.fields[field].items()
+                }
+                result[field] = dict(sorted(((v, c) for v, c in counts.items() if c), key=lambda vc: (-vc[1], vc[0])))
+            return result
+
+    def budget_hint(self, item):
+        # "Most monitors in our catalog cost $150–$400." from the 10th to the 90th percentile
+        with self._lock:
+            group = self._group_for(item, relaxed=True)
+            if group is None or len(group.prices) < MIN_HINT_PRODUCTS:
+                return None
+            prices = group.prices
+            low = _nice_price(prices[_rank(10, len(prices))], math.floor)
+            high = _nice_price(prices[_rank(90, len(prices))], math.ceil)
+        items = item.lower() if item.lower().endswith("s") else f"{item.lower()}s"
+        if low == high:
+            return f"Most {items} in our catalog cost about ${low:,}."
+        return f"Most {items} in our catalog cost ${low:,}–${high:,}."
+
+
+def _rank(percentile, count):
+    return min(count - 1, round(percentile / 100 * (count - 1)))
+
+
+def _nice_price(price, rounding):
+    step = 10 if price < 1000 else 50
+    return int(rounding(price / step) * step)
+
+
+def price_summary(prices, limit):
+    # Stats over prices[:limit], which is already sorted; nothing here depends on catalog size
+    if limit == 0:
+        return {"min": None, "max": None, "percentiles": {}, "histogram": []}
+    low, high = prices[0], prices[limit - 1]
+    width = (high - low) / HISTOGRAM_BINS
+    histogram = []
+    for i in range(HISTOGRAM_BINS if width else 1):
+        start = low + i * width
+        end = high if not width or i == HISTOGRAM_BINS - 1 else low + (i + 1) * width
+        # Every bin is [start, end) except the last, which also holds the maximum
+        count = (limit if end == high else bisect_left(prices, end, 0, limit)) - bisect_left(prices, start, 0, limit)
+        histogram.append({"min": round(start, 2), "max": round(end, 2), "count": count})
+    return {
+        "min": low,
+        "max": high,
+        "percentiles": {f"p{q}": prices[_rank(q, limit)] for q in PERCENTILES},
+        "histogram": histogram
+    }
+
+
+def create_facet_index(catalog):
+    index = FacetIndex().load(catalog)
+    if hasattr(catalog, "subscribe"):
+        catalog.subscribe(index.apply, index.load)
+    return index
@@ -2,7 +2,7 @@ import React, { useState, useEffect, useRef } from 'react';
 import {
   createTheme, ThemeProvider,
   Box, Paper, TextField, IconButton,
-  Typography, Button, Table, TableHead, TableRow, TableCell, TableBody
+  Typography, Button, Chip, Table, TableHead, TableRow, TableCell, TableBody
 } from '@mui/material';
 import SendIcon from '@mui/icons-material/Send';
 import RestartAltIcon from '@mui/icons-material/RestartAlt';
@@ -31,6 +31,7 @@ function App() {
   const [policyReason, setPolicyReason] = useState('');
   const [products, setProducts] = useState([]);
   const [sessionId] = useState(crypto.randomUUID());
+  const [suggestions, setSuggestions] = useState([]);
 
   const chatEndRef = useRef(null);
 
@@ -38,6 +39,36 @@ function App() {
     chatEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   }, [history]);
 
+  // Typeahead for the word being typed, debounced so only pauses in typing hit the server
+  useEffect(() => {
+    const word = input.endsWith(' ') ? '' : input.split(/\s+/).pop();
+    if (currentSlot || word.length < 2) {
+      setSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        const res = await fetch(`http://localhost:5000/api/suggest?q=${encodeURIComponent(word)}&limit=5`, { signal: controller.signal });
+        const data = await res.json();
+        setSuggestions(data.suggestions.map((s) => s.text));
+      } catch (err) {
+        if (err.name !== 'AbortError') console.error(err);
+      }
+    }, 200);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [input, currentSlot]);
+
+  const applySuggestion = (text) => {
+    const words = input.split(/\s+/);
+    words[words.length - 1] = text;
+    setInput(words.join(' ') + ' ');
+    setSuggestions([]);
+  };
+
   const extractProductsFromResponse = (text) => {
     const matches = text.matchAll(/\| (.*?) \| \$(.*?) \| (.*?) \| \[View\]\((.*?)\) \| (.*?) \| (.*?) \| (.*?) \|/g);
     return [...matches].map((m) => ({
@@ -55,13 +86,14 @@ function App() {
     if (!input.trim()) return;
     const userMessage = input;
     setInput('');
+    setSuggestions([]);
     setHistory((prev) => [...prev, { type: 'user', text: userMessage }]);
 
     try {
       const res = await fetch('http://localhost:5000/api/submit', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ input: userMessage, session_id: sessionId, current_slot: currentSlot }),
+        body: JSON.stringify({ input: userMessage, session_id: sessionId, current_slot: currentSlot, clarify_mode: 'multi' }),
       });
       const data = await res.json();
 
@@ -241,10 +273,18 @@ function App() {
             </Box>
           )}
 
+          {suggestions.length > 0 && (
+            <Box display="flex" gap={1} mb={1} flexWrap="wrap">
+              {suggestions.map((text) => (
+                <Chip key={text} label={text} size="small" variant="outlined" color="primary" onClick={() => applySuggestion(text)} />
+              ))}
+            </Box>
+          )}
+
           <Box display="flex" gap={1}>
             <TextField
               fullWidth
-              placeholder={currentSlot ? `Enter ${currentSlot}` : 'Type your request...'}
+              placeholder={currentSlot === 'all' ? 'Answer the questions above in one reply...' : currentSlot ? `Enter ${currentSlot}` : 'Type your request...'}
               variant="outlined"
               value={input}
               onChange={(e) => setInput(e.target.value)}
@@ -1,7 +1,6 @@
 import random
 import json
-from bs4 import BeautifulSoup
-import requests
+from vendors import VENDOR_CONNECTORS
 
 # Define price ranges for different categories
 price_ranges = {
@@ -14,23 +13,8 @@ price_ranges = {
 
 def scrape_product_info(category, max_price, purpose, preferences):
     try:
-        # Example URL (replace with actual scraping target)
-        url = f"https://example.com/search?q={category}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Placeholder for scraping logic (adjust based on actual site structure)
-        products = []
-        for item in soup.select('.product-item'):  # Adjust selector
-            name = item.select_one('.product-name').text.strip()
-            price_text = item.select_one('.product-price').text.strip().replace('$', '')
-            price = float(price_text)
-            if price <= max_price:
-                # Simulate delivery info (replace with actual scraping)
-                delivery_text = "Free delivery"  # Example
-                products.append({"name": name, "price": price, "delivery": delivery_text})
-        return products
+        connector = VENDOR_CONNECTORS["Example"]()
+        return [{"name": p["title"], "price": p["price"], "delivery": p["delivery_time"]} for p in connector.search(category, max_price)]
     except Exception:
         print(f"Web scraping failed for {category}: Unable to retrieve data. Returning empty list.")
         return []
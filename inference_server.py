@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+MODEL_NAME = "google/flan-t5-large"
+
+
+class InferenceError(Exception):
+    # Any failure on the model side; the subclasses are the ones callers may retry
+    pass
+
+
+class InferenceOverloaded(InferenceError):
+    pass
+
+
+class InferenceTimeout(InferenceError):
+    pass
+
+
+def load_pipeline(model_name=MODEL_NAME, token=None):
+    from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
+    tokenizer = AutoTokenizer.from_pretrained(model_name, token=token)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, token=token)
+    return pipeline("text2text-generation", model=model, tokenizer=tokenizer)
+
+
+class _Request:
+    def __init__(self, prompt, kwargs, deadline):
+        self.prompt = prompt
+        self.kwargs = kwargs
+        self.deadline = deadline
+        self.done = threading.Event()
+        self.output = None
+        self.error = None
+
+
+class BatchingGenerator:
+    # Collects prompts from concurrent callers for up to max_wait_ms and runs them through the
+    # pipeline as one padded batch. Calls look exactly like pipeline(prompt, max_length=...).
+    def __init__(self, pipeline, max_batch=16, max_wait_ms=10, max_queue=256, timeout=30):
+        self.pipeline = pipeline
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stats = {"requests": 0, "batches": 0, "rejected": 0, "timed_out": 0, "max_batch_seen": 0}
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+
+    def __call__(self, prompt, timeout=None, **kwargs):
+        timeout = self.timeout if timeout is None else timeout
+        request = _Request(prompt, kwargs, time.time() + timeout)
+        try:
+            self.queue.put_nowait(request)  # Admission control: reject instead of queueing unboundedly
+        except queue.Full:
+            self.stats["rejected"] += 1
+            raise InferenceOverloaded(f"Inference queue is full ({self.queue.maxsize} pending requests).")
+        if not request.done.wait(timeout):
+            self.stats["timed_out"] += 1
+            raise InferenceTimeout(f"Inference did not finish within {timeout}s.")
+        if request.error:
+            raise request.error
+        return [{"generated_text": request.output}]
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        batch_deadline = time.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = batch_deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            now = time.time()
+            live = [r for r in batch if r.deadline > now]  # Callers that already gave up are skipped
+
+            # Generation settings must match within one pipeline call
+            groups = {}
+            for r in live:
+                groups.setdefault(json.dumps(r.kwargs, sort_keys=True), []).append(r)
+            for requests in groups.values():
+                try:
+                    outputs = self.pipeline([r.prompt for r in requests], batch_size=len(requests), **requests[0].kwargs)
+                    for r, output in zip(requests, outputs):
+                        r.output = (output[0] if isinstance(output, list) else output)["generated_text"]
+                except Exception as e:
+                    for r in requests:
+                        r.error = e
+                for r in requests:
+                    r.done.set()
+                self.stats["batches"] += 1
+                self.stats["requests"] += len(requests)
+                self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(requests))
+
+    def snapshot(self):
+        return dict(self.stats, queue_depth=self.queue.qsize())
+
+
+class _InferenceHandler(socketserver.StreamRequestHandler):
+    # One JSON object per line in each direction; a connection may carry many requests
+    def handle(self):
+        for line in self.rfile:
+            try:
+                message = json.loads(line)
+                output = self.server.generator(message["prompt"], timeout=message.get("timeout"), **message.get("kwargs", {}))
+                reply = {"generated_text": output[0]["generated_text"]}
+            except InferenceOverloaded as e:
+                reply = {"error": str(e), "type": "overloaded"}
+            except InferenceTimeout as e:
+                reply = {"error": str(e), "type": "timeout"}
+            except Exception as e:
+                reply = {"error": str(e), "type": "error"}
+            self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class InferenceServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128  # Many app workers connect at once
+
+    def __init__(self, socket_path, generator):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.generator = generator
+        super().__init__(socket_path, _InferenceHandler)
+
+
+class RemoteGenerator:
+    # Client for InferenceServer with the same call signature as the local pipeline
+    def __init__(self, socket_path, timeout=30):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        if getattr(self._local, "conn", None) is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout + 5)
+            sock.connect(self.socket_path)
+            self._local.conn = (sock, sock.makefile("rb"))
+        return self._local.conn
+
+    def __call__(self, prompt, timeout=None, **kwargs):
+        message = json.dumps({"prompt": prompt, "kwargs": kwargs, "timeout": timeout or self.timeout}) + "\n"
+        try:
+            sock, reader = self._connection()
+            sock.sendall(message.encode("utf-8"))
+            line = reader.readline()
+            if not line:
+                raise ConnectionError("Inference server closed the connection.")
+        except OSError:
+            self._local.conn = None
+            raise
+        try:
+            reply = json.loads(line)
+            if "error" in reply:
+                raise {"overloaded": InferenceOverloaded, "timeout": InferenceTimeout}.get(reply.get("type"), InferenceError)(reply["error"])
+            return [{"generated_text": reply["generated_text"]}]
+        except (ValueError, KeyError, TypeError) as e:
+            self._local.conn = None  # The stream is out of sync; reconnect on the next call
+            raise InferenceError(f"Malformed reply from the inference server: {str(e)}")
+
+
+def create_generator(pipeline_loader):
+    # INFERENCE_SOCKET points at a shared inference_server.py process; otherwise batch in-process
+    socket_path = os.getenv("INFERENCE_SOCKET")
+    if socket_path:
+        return RemoteGenerator(socket_path, timeout=float(os.getenv("INFERENCE_TIMEOUT", "30")))
+    pipeline = pipeline_loader()
+    if pipeline is None:
+        return None
+    return BatchingGenerator(
+        pipeline,
+        max_batch=int(os.getenv("INFERENCE_MAX_BATCH", "16")),
+        max_wait_ms=float(os.getenv("INFERENCE_MAX_WAIT_MS", "10")),
+        max_queue=int(os.getenv("INFERENCE_MAX_QUEUE", "256")),
+        timeout=float(os.getenv("INFERENCE_TIMEOUT", "30"))
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve one shared Flan-T5 model to every app worker over a Unix socket.")
+    parser.add_argument("--socket", default=os.getenv("INFERENCE_SOCKET", "/tmp/flan-t5.sock"))
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--max-queue", type=int, default=256)
+    args = parser.parse_args()
+
+    generator = BatchingGenerator(load_pipeline(args.model, os.getenv("HF_TOKEN")), args.max_batch, args.max_wait_ms, args.max_queue)
+    with InferenceServer(args.socket, generator) as server:
+        print(f"Serving {args.model} on {args.socket}")
+        server.serve_forever()
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+GREETING_PHRASES = {
+    "hi", "hii", "hello", "hey", "hey there", "hi there", "hello there", "hiya", "yo",
+    "good morning", "good afternoon", "good evening", "greetings", "howdy", "hello bot", "hi bot"
+}
+GREETING_RESPONSES = [
+    "Hello! I'm your procurement assistant. Tell me what you need to buy, for example: 'I need an office chair under $300'.",
+    "Hi there! I can help you find and order tail-spend items. What are you looking for, and what's your budget?",
+    "Hello! Looking to purchase something? Describe the item, your budget and what it's for, and I'll find options."
+]
+GENERAL_QUERY_RESPONSES = [
+    "I'm not sure I understood that. Could you tell me which item you'd like to buy and your approximate budget?",
+    "Sorry, that wasn't clear to me. Try something like 'I need a monitor for office work under $250'.",
+    "Could you clarify your request? Let me know the item you need, your budget, and what you'll use it for."
+]
+
+
+def normalize_text(text):
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def canned_response(intent, user_input):
+    # Pre-rendered replies for trivial greetings and very short unclear inputs; None means use the model
+    normalized = normalize_text(user_input).strip("!?.,:; ")
+    if intent == "greeting" and normalized in GREETING_PHRASES:
+        responses = GREETING_RESPONSES
+    elif intent == "general_query" and len(normalized.split()) <= 2:
+        responses = GENERAL_QUERY_RESPONSES
+    else:
+        return None
+    return responses[int(hashlib.sha1(normalized.encode("utf-8")).hexdigest(), 16) % len(responses)]
+
+
+class LLMCache:
+    # LRU cache of generated text keyed by model identity, generation settings and normalized prompt.
+    # When db_path is set, entries are written through to an llm_cache table and reloaded at startup.
+    def __init__(self, max_entries=5000, db_path=None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if db_path:
+            with sqlite3.connect(db_path, timeout=10) as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, output TEXT, model TEXT, timestamp REAL)")
+                rows = conn.execute("SELECT key, output FROM llm_cache ORDER BY timestamp DESC LIMIT ?", (max_entries,)).fetchall()
+            for key, output in reversed(rows):
+                self.entries[key] = output
+
+    @staticmethod
+    def make_key(model_id, prompt, **settings):
+        material = "\x1f".join([model_id, repr(sorted(settings.items())), normalize_text(prompt)])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, output, model_id=""):
+        with self._lock:
+            self.entries[key] = output
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        if self.db_path:
+            try:
+                with sqlite3.connect(self.db_path, timeout=10) as conn:
+                    conn.execute("INSERT OR REPLACE INTO llm_cache (key, output, model, timestamp) VALUES (?, ?, ?, ?)",
+                                 (key, output, model_id, time.time()))
+            except sqlite3.Error as e:
+                print(f"LLM cache persist failed: {str(e)}")
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def snapshot(self):
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate(), 3)}
+
+
+class CachedGenerator:
+    # Drop-in wrapper for a text2text-generation pipeline: generator(prompt, max_length=...)
+    def __init__(self, generator, cache, model_id):
+        self.generator = generator
+        self.cache = cache
+        self.model_id = model_id
+
+    def __call__(self, prompt, **kwargs):
+        key = self.cache.make_key(self.model_id, prompt, **kwargs)
+        output = self.cache.get(key)
+        if output is None:
+            output = self.generator(prompt, **kwargs)[0]["generated_text"]
+            self.cache.put(key, output, self.model_id)
+        return [{"generated_text": output}]
+
+
+class CountingGenerator:
+    # Counts the calls that reach the wrapped generator. Counts are per thread because
+    # Streamlit runs each session's script on its own thread.
+    def __init__(self, generator):
+        self.generator = generator
+        self._local = threading.local()
+
+    @property
+    def calls(self):
+        return getattr(self._local, "calls", 0)
+
+    def reset(self):
+        self._local.calls = 0
+
+    def __call__(self, prompt, **kwargs):
+        self._local.calls = self.calls + 1
+        return self.generator(prompt, **kwargs)
+
+
+def create_llm_cache():
+    persist = os.getenv("LLM_CACHE_PERSIST", "off").lower() in ["1", "on", "true"]
+    return LLMCache(
+        max_entries=int(os.getenv("LLM_CACHE_SIZE", "5000")),
+        db_path=os.getenv("LLM_CACHE_DB", "chatbot.db") if persist else None
+    )
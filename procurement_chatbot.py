@@ -1,15 +1,21 @@
 import re
-import json
 import streamlit as st
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 import time
 import uuid
 import os
-from email.mime.text import MIMEText
-import smtplib
+import threading
+from catalog_snapshot import load_catalog, search_catalog
+from catalog_store import CatalogStore
+from request_log import create_request_logger
+from approval_queue import create_approval_dispatcher, smtp_auth_enabled
+from llm_cache import CachedGenerator, CountingGenerator, create_llm_cache, canned_response
+from product_identity import stable_product_id, merge_products
+from vendors import search_vendors, cached_vendor_results
+from query_normalizer import QueryNormalizer
+from facets import FacetIndex
+from warmup import start_warmup
+from inference_server import MODEL_NAME, InferenceError, InferenceOverloaded, InferenceTimeout, create_generator, load_pipeline
+from clarification import MULTI_SLOT, clarification_prompt, parse_multi_slot_reply, apply_optional_defaults
 try:
     from dotenv import load_dotenv
     dotenv_available = True
@@ -23,6 +29,12 @@ load_dotenv()
 EMAIL_USER = os.getenv("EMAIL_USER") if dotenv_available else None
 EMAIL_PASS = os.getenv("EMAIL_PASS") if dotenv_available else None
 APPROVER_EMAIL = os.getenv("APPROVER_EMAIL") if dotenv_available else "approver@example.com"
+# Approvals can be queued when there are credentials, or when SMTP_AUTH=off needs none
+APPROVAL_EMAIL_ENABLED = bool(EMAIL_USER and EMAIL_PASS) or not smtp_auth_enabled()
+# "single" asks for one missing slot per turn, "multi" asks for all of them at once
+CLARIFY_MODE = os.getenv("CLARIFY_MODE", "single")
+# Turns shown before "Show earlier messages"
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "10"))
 
 # Set page configuration
 st.set_page_config(page_title="Conversational Buying Assistant", page_icon="🛍️")
@@ -31,75 +43,90 @@ st.set_page_config(page_title="Conversational Buying Assistant", page_icon="🛍
 @st.cache_resource
 def load_model():
     try:
-        HF_TOKEN = os.getenv("HF_TOKEN")
-        tokenizer = AutoTokenizer.from_pretrained("google/flan-t5-large", token=HF_TOKEN)
-        model = AutoModelForSeq2SeqLM.from_pretrained("google/flan-t5-large", token=HF_TOKEN)
-        return pipeline("text2text-generation", model=model, tokenizer=tokenizer)
+        # One batching generator shared by every session, or a client for inference_server.py
+        return create_generator(lambda: load_pipeline(MODEL_NAME, os.getenv("HF_TOKEN")))
     except Exception as e:
         st.error(f"Failed to load model: {str(e)}. Check token, internet, or disk space (~3GB needed).")
         return None
 
+@st.cache_resource
+def load_llm_cache():
+    # Shared across sessions so repeated prompts skip decoding entirely
+    return create_llm_cache()
+
+llm_cache = load_llm_cache()
 generator = load_model()
+model_calls = None
+if generator is not None:
+    # Counts only the calls that miss the cache and actually run the model
+    model_calls = CountingGenerator(generator)
+    generator = CachedGenerator(model_calls, llm_cache, MODEL_NAME)
 
-def scrape_amazon_products(item, budget):
-    try:
-        base_url = f"https://www.amazon.com/s?k={item.replace(' ', '+')}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5"
-        }
-        for attempt in range(3):  # Retry 3 times
-            response = requests.get(base_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-            products = []
-            for product in soup.select(".s-result-item"):
-                title_elem = product.select_one(".a-text-normal")
-                price_elem = product.select_one(".a-price-whole")
-                link_elem = product.select_one(".a-link-normal")
-                if title_elem and price_elem and link_elem:
-                    title = title_elem.get_text(strip=True)
-                    price_text = price_elem.get_text(strip=True).replace(",", "").replace("$", "")
-                    price = float(price_text) if price_text.replace(".", "").isdigit() else float('inf')
-                    link = urljoin(base_url, link_elem.get("href"))
-                    if price <= budget:
-                        products.append({"title": title, "price": price, "link": link, "description": "From Amazon", "availability": "Check site", "delivery_time": "Varies", "product_id": str(uuid.uuid4())})
-            if products:
-                return products[:3]
-            time.sleep(2 ** attempt)  # Exponential backoff
-        st.warning("Web scraping failed after retries. Using local catalog only.")
-        return []
-    except Exception as e:
-        st.warning(f"Web scraping failed: {str(e)}. Using local catalog only.")
-        return []
+@st.cache_resource
+def load_local_catalog():
+    # Compiles catalog.json into an mmap snapshot shared by every session and process,
+    # with live SKU updates from the admin API layered on top
+    return CatalogStore(load_catalog("catalog.bin", "catalog.json"), os.getenv("CATALOG_JOURNAL", "catalog_updates.jsonl"))
 
-def get_products(item, budget):
+@st.cache_resource
+def load_catalog_indexes():
+    # Item-name normalizer and price ranges for budget questions, filled once per process from
+    # one pass over the catalog in the background and kept in step with live SKU updates.
+    # While loading, item names pass through unchanged and budget hints are skipped.
+    normalizer, facet_index = QueryNormalizer(), FacetIndex()
+    threading.Thread(target=load_local_catalog().attach, args=(normalizer, facet_index), name="catalog-indexes", daemon=True).start()
+    return normalizer, facet_index
+
+def load_query_normalizer():
+    return load_catalog_indexes()[0]
+
+def load_facet_index():
+    return load_catalog_indexes()[1]
+
+@st.cache_resource
+def load_request_logger():
+    # One background writer shared by every Streamlit session
+    return create_request_logger()
+
+request_logger = load_request_logger()
+
+def log_turn(user_input, current_slot, new_slot, started, calls=None):
+    if request_logger is None:
+        return
+    best_product = st.session_state.best_product if new_slot is None else None
+    request_logger.log({
+        "kind": "turn",
+        "session_id": st.session_state.conversation_id,
+        "input": user_input,
+        "current_slot": current_slot,
+        "next_slot": new_slot,
+        "context": dict(st.session_state.context),
+        "candidates": [{"title": best_product["title"], "price": best_product["price"], "match_score": best_product.get("match_score")}] if best_product else [],
+        "timings": {"total_ms": round((time.time() - started) * 1000, 2)},
+        "model_calls": calls
+    })
+
+def scrape_vendor_products(item, budget):
+    # Every approved vendor is queried concurrently under one deadline
+    products = search_vendors(item, budget)
+    if not products:
+        st.warning("No vendor results within the time limit. Using local catalog only.")
+    return products
+
+def get_products(item, budget, vendor_item=None):
+    # vendor_item is the item as the user wrote it; item may be its normalized spelling
+    vendor_item = vendor_item or item
     try:
-        with open("catalog.json", "r") as f:
-            catalog = json.load(f)
-        local_products = [p for p in catalog if p["price"] <= budget and item.lower() in p["title"].lower()]
-        amazon_products = scrape_amazon_products(item, budget)
-
-        # Ensure all products have product_id
-        for p in local_products + amazon_products:
-            if "product_id" not in p:
-                p["product_id"] = str(uuid.uuid4())
-
-        # Update local products with scraped links where possible
-        for lp in local_products:
-            for ap in amazon_products:
-                if item.lower() in ap["title"].lower() and lp["price"] <= budget:
-                    lp["link"] = ap["link"]
-                    break
-
-        return local_products + [p for p in amazon_products if p not in local_products][:3 - len(local_products)]
+        catalog = load_local_catalog()
+        catalog.refresh()
+        local_products = search_catalog(catalog, item, budget)
+        vendor_products = scrape_vendor_products(vendor_item, budget)
+
+        # Products seen in both sources collapse into one entry with the best attributes of each
+        merged = merge_products(local_products, vendor_products)
+        return merged[:max(3, len(local_products))]
     except FileNotFoundError:
-        fallback = scrape_amazon_products(item, budget)[:3]
-        for p in fallback:
-            if "product_id" not in p:
-                p["product_id"] = str(uuid.uuid4())
-        return fallback
+        return scrape_vendor_products(vendor_item, budget)[:3]
     except Exception as e:
         return [{"title": "Error", "price": 0, "description": f"Error: {str(e)}", "link": "#", "availability": "N/A", "delivery_time": "N/A", "product_id": str(uuid.uuid4())}]
 
@@ -144,6 +171,11 @@ def extract_details(user_input):
         return item, budget, intent, purpose
     return None, None, intent, None
 
+@st.cache_resource
+def load_cache_warmer():
+    # Once per process: popular queries from history prefetch vendor results and model extractions
+    return start_warmup(search_vendors, extract_details, cached_vendor_results)
+
 def check_clarity(context):
     required_slots = ["budget", "purpose", "brand", "features", "urgency"]
     missing_slots = [slot for slot in required_slots if context.get(slot) is None]
@@ -205,6 +237,12 @@ def generate_clarification_question(missing_slot, item=None):
         "urgency": "How soon do you need the item delivered?"
     }.get(missing_slot, "Could you provide more details about your request?")
 
+def ask_clarification(missing_slot, item=None):
+    # Budget questions mention the catalog's typical price range for the item
+    question = generate_clarification_question(missing_slot, item)
+    hint = load_facet_index().budget_hint(item) if missing_slot == "budget" and item else None
+    return f"{question} {hint}" if hint else question
+
 def interpret_response(user_input, current_slot):
     if current_slot == "budget":
         budget_match = re.search(r"\$?(\d+\.?\d*)", user_input, re.IGNORECASE)
@@ -244,12 +282,17 @@ def passes_company_policy(product):
             return False, f"Product rejected due to restricted term: '{word}'."
     return True, ""
 
+@st.cache_resource
+def load_approval_dispatcher():
+    # One sender thread and SMTP connection shared by every Streamlit session
+    return create_approval_dispatcher(EMAIL_USER, EMAIL_PASS)
+
 def send_approval_email(product, match_score):
-    if not EMAIL_USER or not EMAIL_PASS:
+    if not APPROVAL_EMAIL_ENABLED:
         st.warning("Email credentials not configured. Please contact approver manually.")
         return False
     try:
-        product_id = product.get("product_id", str(uuid.uuid4()))
+        product_id = product.get("product_id") or stable_product_id(product["title"], product.get("vendor"), product.get("link"))
         subject = f"Approval Request: {product['title']}"
         body = f"""
         Product Approval Request
@@ -263,21 +306,13 @@ def send_approval_email(product, match_score):
         Approve here: https://example.com/approve?product_id={product_id}
         """
 
-        msg = MIMEText(body)
-        msg["Subject"] = subject
-        msg["From"] = EMAIL_USER
-        msg["To"] = APPROVER_EMAIL
-
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(EMAIL_USER, EMAIL_PASS)
-            server.send_message(msg)
-
-        st.success(f"Approval email sent to {APPROVER_EMAIL}.")
+        # Queued in chatbot.db; the background dispatcher sends it without blocking the UI
+        load_approval_dispatcher().enqueue(APPROVER_EMAIL, subject, body, product_id)
+        st.success(f"Approval request queued for {APPROVER_EMAIL}.")
         return True
 
     except Exception as e:
-        st.error(f"Failed to send approval email via SMTP: {str(e)}")
+        st.error(f"Failed to queue approval email: {str(e)}")
 
         # Fallback to mailto link
         encoded_subject = subject.replace(" ", "%20")
@@ -296,20 +331,43 @@ def send_approval_email(product, match_score):
         )
         return False
 
+def safe_generate_response(user_input, context, current_slot=None):
+    try:
+        intent = "purchase_request"
+        if not current_slot:
+            # Greeting templates need no model call; other first inputs are routed on the classified
+            # intent (extraction outputs are cached, so the purchase path reuses them)
+            intent = "greeting" if canned_response("greeting", user_input) else (extract_details(user_input)[2] or "general_query")
+        return generate_response(user_input, context, intent, current_slot)
+    except (InferenceOverloaded, InferenceTimeout) as e:
+        st.warning(f"The assistant is busy: {str(e)}")
+        return "I'm handling a lot of requests right now. Please send that again in a moment.", current_slot
+    except (OSError, InferenceError) as e:
+        st.warning(f"The model failed: {str(e)}")
+        return "Something went wrong on my side. Please send that again in a moment.", current_slot
+
 def generate_response(user_input, context, intent, current_slot=None):
+    if intent in ["greeting", "general_query"]:
+        canned = canned_response(intent, user_input)
+        if canned:
+            return canned, None
     if generator is None:
         return "I'm sorry, I can't help you right now. Please try again later.", None
     if intent == "purchase_request":
         if current_slot:
             # Handle clarification response
-            value = interpret_response(user_input, current_slot)
-            if value is not None:
-                context[current_slot] = value
+            if current_slot == MULTI_SLOT:
+                context.update(parse_multi_slot_reply(user_input, check_clarity(context)))
+                apply_optional_defaults(context)
+            else:
+                value = interpret_response(user_input, current_slot)
+                if value is not None:
+                    context[current_slot] = value
             missing_slots = check_clarity(context)
             if missing_slots:
-                return generate_clarification_question(missing_slots[0], context["item"]), missing_slots[0]
+                return clarification_prompt(missing_slots, context["item"], CLARIFY_MODE, ask_clarification)
             else:
-                products = get_products(context["item"], context["budget"])
+                products = get_products(context["item"], context["budget"], context.get("vendor_item"))
                 if products and "Error" not in products[0]["title"]:
                     # Calculate match scores for all products
                     for p in products:
@@ -343,7 +401,8 @@ def generate_response(user_input, context, intent, current_slot=None):
             item, budget, intent, purpose = extract_details(user_input)
             if item:
                 context.update({
-                    "item": item,
+                    "item": load_query_normalizer().normalize(item),
+                    "vendor_item": item,
                     "budget": budget,
                     "purpose": purpose,
                     "brand": None,
@@ -352,8 +411,8 @@ def generate_response(user_input, context, intent, current_slot=None):
                 })
                 missing_slots = check_clarity(context)
                 if missing_slots:
-                    return generate_clarification_question(missing_slots[0], context["item"]), missing_slots[0]
-                products = get_products(context["item"], context["budget"])
+                    return clarification_prompt(missing_slots, context["item"], CLARIFY_MODE, ask_clarification)
+                products = get_products(context["item"], context["budget"], context.get("vendor_item"))
                 if products and "Error" not in products[0]["title"]:
                     for p in products:
                         p["match_score"] = score_product(p, context)
@@ -375,6 +434,8 @@ def generate_response(user_input, context, intent, current_slot=None):
 
                     return f"Thank you! Here are some options for a {context['item']}:\n\n{table}{explanation}", None
                 return f"No suitable {context['item']} found under ${context['budget']:.2f}. Please adjust your budget or try again.", None
+            # Classified as a purchase but no item could be extracted: ask what they need
+            return generate_response(user_input, context, "general_query")
     elif intent == "greeting":
         prompt = f"""You are a procurement chatbot. The user said: '{user_input}'. Respond politely and offer assistance."""
         return generator(prompt, max_length=150)[0]["generated_text"], None
@@ -382,6 +443,55 @@ def generate_response(user_input, context, intent, current_slot=None):
         prompt = f"""You are a procurement chatbot. The user said: '{user_input}'. Indicate it's unclear and ask for clarification."""
         return generator(prompt, max_length=150)[0]["generated_text"], None
 
+def describe_context(context):
+    context_display = f"Item = {context['item']}"
+    if context["budget"]: context_display += f", Budget = ${context['budget']:.2f}"
+    if context["purpose"]: context_display += f", Purpose = {context['purpose']}"
+    if context["brand"]: context_display += f", Brand = {context['brand']}"
+    if context["features"]: context_display += f", Features = {context['features']}"
+    if context["urgency"]: context_display += f", Urgency = {context['urgency']}"
+    return context_display
+
+def run_turn(input_key, current_slot, turn_index):
+    # Memoized by (conversation, turn, input): a rerun or a second submit of the same turn
+    # reuses the stored result instead of calling the model or the vendors again
+    user_input = st.session_state.get(input_key, "")
+    if not user_input:
+        return None
+    key = (st.session_state.conversation_id, turn_index, user_input)
+    if key in st.session_state.turn_results:
+        return st.session_state.turn_results[key]
+
+    started = time.time()
+    if model_calls is not None:
+        model_calls.reset()
+    response, new_slot = safe_generate_response(user_input, st.session_state.context, current_slot)
+    calls = model_calls.calls if model_calls is not None else 0
+    log_turn(user_input, current_slot, new_slot, started, calls)
+
+    context = st.session_state.context
+    intent = "clarification" if current_slot else "initial"
+    st.session_state.history.append({
+        "user": user_input,
+        "bot": response,
+        "item": context["item"],
+        "budget": context["budget"],
+        "purpose": context["purpose"],
+        "brand": context["brand"],
+        "features": context["features"],
+        "urgency": context["urgency"],
+        "intent": intent,
+        "conversation_id": st.session_state.conversation_id,
+        "extracted": describe_context(context) if intent == "initial" and context["item"] else None,  # Rendered once, not on every rerun
+        "model_calls": calls
+    })
+    st.session_state.current_slot = new_slot
+    st.session_state.turn_results[key] = {"response": response, "new_slot": new_slot, "model_calls": calls}
+    return st.session_state.turn_results[key]
+
+def show_earlier_messages():
+    st.session_state.history_pages += 1
+
 def main():
     st.title("🛍️ Conversational Buying Assistant")
     st.write("Enter your request (e.g., 'I need a laptop for college work under $500') to get started.")
@@ -395,8 +505,10 @@ def main():
         st.session_state.current_slot = None
     if "conversation_id" not in st.session_state:
         st.session_state.conversation_id = str(uuid.uuid4())
-    if "last_input" not in st.session_state:
-        st.session_state.last_input = ""
+    if "turn_results" not in st.session_state:
+        st.session_state.turn_results = {}
+    if "history_pages" not in st.session_state:
+        st.session_state.history_pages = 1
     if "best_product" not in st.session_state:
         st.session_state.best_product = None
     if "passes_policy" not in st.session_state:
@@ -404,66 +516,36 @@ def main():
     if "policy_reason" not in st.session_state:
         st.session_state.policy_reason = ""
 
-    # Initial request input
+    # Each turn gets its own input widget and runs from the widget callbacks, so the turn runs once
+    # when it is submitted and the next rerun already shows a fresh, empty input
+    turn_index = sum(1 for entry in st.session_state.history if entry["conversation_id"] == st.session_state.conversation_id)
+    input_key = f"turn_{st.session_state.conversation_id}_{turn_index}"
+    turn_args = (input_key, st.session_state.current_slot, turn_index)
     if not st.session_state.current_slot:
-        initial_input = st.text_input("Your Request:", placeholder="e.g., I need a laptop for college work under $500", key="initial_input")
-        if st.button("Submit Initial Request") or (initial_input and st.session_state.last_input != initial_input):
-            if initial_input:
-                response, new_slot = generate_response(initial_input, st.session_state.context, "purchase_request")
-                st.session_state.history.append({
-                    "user": initial_input,
-                    "bot": response,
-                    "item": st.session_state.context["item"],
-                    "budget": st.session_state.context["budget"],
-                    "purpose": st.session_state.context["purpose"],
-                    "brand": st.session_state.context["brand"],
-                    "features": st.session_state.context["features"],
-                    "urgency": st.session_state.context["urgency"],
-                    "intent": "initial",
-                    "conversation_id": st.session_state.conversation_id
-                })
-                if new_slot:
-                    st.session_state.current_slot = new_slot
-                st.session_state.last_input = initial_input
+        # Initial request input
+        st.text_input("Your Request:", placeholder="e.g., I need a laptop for college work under $500", key=input_key, on_change=run_turn, args=turn_args)
+        st.button("Submit Initial Request", on_click=run_turn, args=turn_args)
     else:
         # Dynamic input for clarification questions
-        user_input = st.text_input(f"{st.session_state.current_slot.capitalize()} Response:", key=f"clarify_{st.session_state.current_slot}")
-        if st.button("Submit Response") or (user_input and st.session_state.get(f"last_{st.session_state.current_slot}") != user_input):
-            if user_input:
-                response, new_slot = generate_response(user_input, st.session_state.context, "purchase_request", st.session_state.current_slot)
-                st.session_state.history.append({
-                    "user": user_input,
-                    "bot": response,
-                    "item": st.session_state.context["item"],
-                    "budget": st.session_state.context["budget"],
-                    "purpose": st.session_state.context["purpose"],
-                    "brand": st.session_state.context["brand"],
-                    "features": st.session_state.context["features"],
-                    "urgency": st.session_state.context["urgency"],
-                    "intent": "clarification",
-                    "conversation_id": st.session_state.conversation_id
-                })
-                if new_slot:
-                    st.session_state.current_slot = new_slot
-                else:
-                    st.session_state.current_slot = None
-                st.session_state[f"last_{st.session_state.current_slot if new_slot else 'initial'}"] = user_input
+        label = "Your Answers:" if st.session_state.current_slot == MULTI_SLOT else f"{st.session_state.current_slot.capitalize()} Response:"
+        st.text_input(label, key=input_key, on_change=run_turn, args=turn_args)
+        st.button("Submit Response", on_click=run_turn, args=turn_args)
 
-    if st.session_state.history:
+    entries = [entry for entry in st.session_state.history if entry["conversation_id"] == st.session_state.conversation_id]
+    if entries:
         st.subheader("Conversation History")
-        for entry in st.session_state.history:
-            if entry["conversation_id"] == st.session_state.conversation_id:
-                st.write(f"**You**: {entry['user']}")
-                if entry["intent"] in ["initial", "purchase_request"] and entry["item"]:
-                    context_display = f"Item = {entry['item']}"
-                    if entry["budget"]: context_display += f", Budget = ${entry['budget']:.2f}"
-                    if entry["purpose"]: context_display += f", Purpose = {entry['purpose']}"
-                    if entry["brand"]: context_display += f", Brand = {entry['brand']}"
-                    if entry["features"]: context_display += f", Features = {entry['features']}"
-                    if entry["urgency"]: context_display += f", Urgency = {entry['urgency']}"
-                    st.write(f"**Extracted**: {context_display}")
-                st.markdown(entry["bot"])
-                st.write("---")
+        # Only the latest pages are rendered; older turns stay collapsed until asked for
+        shown = entries[-st.session_state.history_pages * HISTORY_PAGE_SIZE:]
+        if len(shown) < len(entries):
+            st.button(f"Show earlier messages ({len(entries) - len(shown)} hidden)", on_click=show_earlier_messages)
+        for entry in shown:
+            st.write(f"**You**: {entry['user']}")
+            if entry.get("extracted"):
+                st.write(f"**Extracted**: {entry['extracted']}")
+            st.markdown(entry["bot"])
+            if entry.get("model_calls") is not None:
+                st.caption(f"Model calls this turn: {entry['model_calls']}")
+            st.write("---")
 
     # Display buttons for best product
     if st.session_state.best_product and st.session_state.current_slot is None:
@@ -474,6 +556,23 @@ def main():
             if st.button("Mail Approver", key=f"approval_{st.session_state.conversation_id}"):
                 send_approval_email(st.session_state.best_product, st.session_state.best_product["match_score"])
 
+    load_catalog_indexes()  # Starts the background index build on the first page view
+    warmer = load_cache_warmer()
+    if warmer and warmer.report["cold_ms"] is not None:
+        st.sidebar.subheader("Cache Warm-up")
+        st.sidebar.write(f"{warmer.report['warmed']} queries warmed: cold {warmer.report['cold_ms']:.0f} ms vs warm {warmer.report['warm_ms']:.1f} ms")
+
+    cache_stats = llm_cache.snapshot()
+    st.sidebar.subheader("Model Cache")
+    st.sidebar.write(f"Hit rate: {cache_stats['hit_rate']:.0%} ({cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['entries']} entries)")
+
+    if APPROVAL_EMAIL_ENABLED:
+        stats = load_approval_dispatcher().snapshot()
+        st.sidebar.subheader("Approval Queue")
+        st.sidebar.write(f"Pending: {stats['queue_depth']} | Sent: {stats['sent']} | Failed: {stats['failed']}")
+        if stats["avg_send_ms"] is not None:
+            st.sidebar.write(f"Avg send: {stats['avg_send_ms']:.0f} ms | Avg wait: {stats['avg_wait_s']:.1f} s")
+
     if st.button("Exit"):
         st.write("Goodbye! The assistant has been stopped.")
         st.stop()
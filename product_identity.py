@@ -0,0 +1,63 @@
+import re
+import uuid
+from urllib.parse import urlsplit, urlunsplit
+
+PRODUCT_NAMESPACE = uuid.UUID("6f1c1d9e-4a8b-5d2e-9c3f-0b7a1e2d4c5f")
+LOCAL_VENDOR = "Local Catalog"
+PLACEHOLDER_LINKS = {"", "#", "https://example.com/product/placeholder"}
+
+# Values that carry no information and should lose to a real value from another source
+UNKNOWN_VALUES = {"", "#", "N/A", "Check site", "Varies", "From Amazon", None}
+
+
+def normalize_title(title):
+    return re.sub(r"[^a-z0-9]+", " ", (title or "").lower()).strip()
+
+
+def canonical_url(url):
+    if not url or url in PLACEHOLDER_LINKS:
+        return ""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    # Amazon product URLs carry tracking paths and parameters; the ASIN is the identity
+    asin = re.search(r"/(?:dp|gp/product)/([A-Z0-9]{10})", parts.path)
+    if "amazon." in host and asin:
+        return f"https://{host}/dp/{asin.group(1)}"
+    return urlunsplit(("https", host, parts.path.rstrip("/"), "", ""))
+
+
+def stable_product_id(title, vendor, url=None):
+    key = "|".join([normalize_title(title), (vendor or "").strip().lower(), canonical_url(url)])
+    return str(uuid.uuid5(PRODUCT_NAMESPACE, key))
+
+
+def merge_products(*sources):
+    # One pass over every source: products with the same canonical URL collapse into the first
+    # one seen, filling in any attribute it was missing. Titles only match when one side has no
+    # real URL (e.g. a local placeholder link); two different URLs are two offers.
+    merged = []
+    by_url = {}
+    by_title = {}
+    for source in sources:
+        for p in source:
+            url_key = canonical_url(p.get("link"))
+            title_key = normalize_title(p.get("title"))
+            existing = by_url.get(url_key) if url_key else None
+            if existing is None:
+                existing = next((q for q in by_title.get(title_key, ())
+                                 if not url_key or not canonical_url(q.get("link"))), None)
+            if existing is None:
+                existing = dict(p)
+                merged.append(existing)
+                by_title.setdefault(title_key, []).append(existing)
+            else:
+                for field, value in p.items():
+                    if existing.get(field) in UNKNOWN_VALUES and value not in UNKNOWN_VALUES:
+                        existing[field] = value
+                if existing.get("link") in PLACEHOLDER_LINKS and url_key:
+                    existing["link"] = p["link"]
+            if url_key:
+                by_url.setdefault(url_key, existing)
+    return merged
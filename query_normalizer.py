@@ -0,0 +1,206 @@
+import argparse
+import json
+import re
+import threading
+from collections import Counter
+
+from catalog_snapshot import search_catalog
+
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+# Words buyers use for things the catalog calls something else; applied only to words the catalog lacks
+SYNONYMS = {
+    "display": "monitor",
+    "screen": "monitor",
+    "notebook": "laptop",
+    "seat": "chair",
+    "table": "desk",
+    "workstation": "desk",
+    "keypad": "keyboard"
+}
+
+# Real items the catalog does not carry; normalization must leave these alone
+OUT_OF_CATALOG_QUERIES = [
+    "cable", "usb cable", "usb cables", "tablet", "tablets", "hard disk", "face masks", "tools",
+    "heat gun", "desktop computer"
+]
+
+# Item phrases the catalog search misses without normalization, used by the hit-rate report
+TEST_QUERIES = [
+    "laptop", "labtop", "laptops", "notebook", "chiar", "chairs", "office chiars", "seat",
+    "keybord", "keyboards", "wireless keybaord", "mechanical keyboards", "display", "displays",
+    "monitr", "gaming monitors", "curved screen", "desks", "standing dekss", "table", "stools"
+] + OUT_OF_CATALOG_QUERIES
+
+MIN_CORRECTION_LENGTH = 5  # Shorter words are too close to other real words ("disk", "desk")
+
+
+def _deletes(word, distance):
+    # Every string reachable from word by removing up to `distance` characters
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a, b):
+    # Optimal string alignment distance: insertions, deletions, substitutions and adjacent swaps
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+
+class QueryNormalizer:
+    # SymSpell-style corrector over the catalog's title vocabulary. Every word is indexed under
+    # all of its deletions up front, so correcting a token only generates the token's own
+    # deletions and looks them up: the cost does not grow with the vocabulary. A word is only
+    # rewritten into a word that catalog titles currently use.
+    def __init__(self, max_distance=2, prefix_length=7, synonyms=None):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.synonyms = dict(SYNONYMS if synonyms is None else synonyms)
+        self.words = Counter()
+        self.deletes = {}
+        self._lock = threading.Lock()
+
+    def _index(self, word):
+        for deleted in _deletes(word[:self.prefix_length], self.max_distance):
+            self.deletes.setdefault(deleted, []).append(word)
+
+    def _add(self, word, count=1):
+        if word not in self.words:
+            self._index(word)
+        self.words[word] += count
+
+    def load(self, products):
+        counts = Counter()
+        for p in products:
+            counts.update(set(w for w in TOKEN_PATTERN.findall((p.get("title") or "").lower()) if len(w) > 2))
+        with self._lock:
+            for word in self.words:
+                self.words[word] = 0  # load replaces the counts; deletes entries of dropped words stay and are skipped
+            for word, count in counts.items():
+                self._add(word, count)
+        return self
+
+    def apply(self, removed, added):
+        # CatalogStore listener: words of new titles become correctable, removed ones fade out
+        with self._lock:
+            for p in removed:
+                for word in set(TOKEN_PATTERN.findall((p.get("title") or "").lower())):
+                    if self.words.get(word, 0) > 0:
+                        self.words[word] -= 1
+            for p in added:
+                for word in set(w for w in TOKEN_PATTERN.findall((p.get("title") or "").lower()) if len(w) > 2):
+                    self._add(word)
+
+    def known(self, word):
+        return self.words.get(word, 0) > 0
+
+    def correct(self, word):
+        # Closest known word within the distance allowed for this length, most frequent first.
+        # Candidates must keep the first letter ("cable" is not "table") and may not just add or
+        # drop letters at the end ("tablet" is not "table").
+        distance = 1 if len(word) <= 5 else self.max_distance
+        best = None
+        for deleted in _deletes(word[:self.prefix_length], distance):
+            for candidate in self.deletes.get(deleted, ()):
+                if not self.known(candidate) or candidate[0] != word[0]:
+                    continue
+                if candidate.startswith(word) or word.startswith(candidate):
+                    continue
+                d = edit_distance(word, candidate)
+                if d <= distance:
+                    rank = (d, -self.words.get(candidate, 0), candidate)
+                    if best is None or rank < best:
+                        best = rank
+        return best[2] if best else None
+
+    def normalize_token(self, token):
+        if len(token) < 3 or self.known(token):
+            return token
+        for form in [token] + self._singular_forms(token):
+            if self.known(form):
+                return form
+            if form in self.synonyms and self.known(self.synonyms[form]):
+                return self.synonyms[form]
+        if len(token) < MIN_CORRECTION_LENGTH:
+            return token
+        for form in [token] + self._singular_forms(token):
+            corrected = self.correct(form)
+            if corrected is not None:
+                return corrected
+        return token
+
+    def _singular_forms(self, token):
+        forms = []
+        if token.endswith("ies"):
+            forms.append(token[:-3] + "y")
+        if token.endswith("es"):
+            forms.append(token[:-2])
+        if token.endswith("s"):
+            forms.append(token[:-1])
+        return forms
+
+    def normalize(self, item):
+        # "Office chiars" -> "Office chair"; untouched words keep the user's casing
+        if not item:
+            return item
+        words = []
+        for word in item.split():
+            token = word.lower()
+            if not TOKEN_PATTERN.fullmatch(token):
+                words.append(word)
+                continue
+            normalized = self.normalize_token(token)
+            words.append(normalized if normalized != token and self.known(normalized) else word)
+        return " ".join(words)
+
+
+def create_query_normalizer(catalog):
+    normalizer = QueryNormalizer().load(catalog)
+    if hasattr(catalog, "subscribe"):
+        catalog.subscribe(normalizer.apply, normalizer.load)
+    return normalizer
+
+
+def hit_rate(catalog, queries, normalize=None):
+    # Share of queries with at least one local catalog match, ignoring budget
+    hits = [q for q in queries if search_catalog(catalog, normalize(q) if normalize else q, float("inf"), limit=1)]
+    return len(hits) / len(queries) if queries else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report how much query normalization raises the local catalog hit rate.")
+    parser.add_argument("--catalog", default="catalog.json")
+    parser.add_argument("--queries", help="File with one item phrase per line (defaults to a built-in test set)")
+    args = parser.parse_args()
+
+    with open(args.catalog, "r") as f:
+        catalog = json.load(f)
+    if args.queries:
+        with open(args.queries, "r") as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = TEST_QUERIES
+
+    normalizer = create_query_normalizer(catalog)
+    for q in queries:
+        normalized = normalizer.normalize(q)
+        if normalized != q:
+            print(f"{q!r} -> {normalized!r}")
+    before = hit_rate(catalog, queries)
+    after = hit_rate(catalog, queries, normalizer.normalize)
+    print(f"Local hit rate on {len(queries)} queries: {before:.0%} -> {after:.0%}")
+    rewritten = [q for q in queries if q in OUT_OF_CATALOG_QUERIES and normalizer.normalize(q) != q]
+    if rewritten:
+        print(f"Out-of-catalog items that were rewritten: {', '.join(rewritten)}")
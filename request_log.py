@@ -0,0 +1,119 @@
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+
+class RequestLogger:
+    # Appends served turns to a JSONL file from a background thread.
+    # Overflow policy when the queue is full:
+    #   "drop"         discard the new entry
+    #   "drop_oldest"  discard the oldest queued entry to make room
+    #   "block"        wait up to block_timeout seconds, then discard
+    def __init__(self, path="requests.jsonl", max_queue=10000, batch_size=200, flush_interval=1.0,
+                 max_bytes=50 * 1024 * 1024, backup_count=5, compress=True, policy="drop", block_timeout=0.05):
+        if policy not in ["drop", "drop_oldest", "block"]:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stats = {"logged": 0, "written": 0, "dropped": 0, "rotations": 0, "errors": 0}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-log-writer", daemon=True)
+        self._thread.start()
+
+    def log(self, entry):
+        entry = dict(entry, timestamp=entry.get("timestamp", time.time()))
+        try:
+            if self.policy == "block":
+                self.queue.put(entry, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(entry)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            if self.policy != "drop_oldest":
+                return False
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(entry)
+            except (queue.Empty, queue.Full):
+                return False
+        self.stats["logged"] += 1
+        return True
+
+    def _drain(self, timeout):
+        batch = []
+        try:
+            batch.append(self.queue.get(timeout=timeout))
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set() or not self.queue.empty():
+            batch = self._drain(self.flush_interval)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        try:
+            data = "".join(json.dumps(entry, default=str) + "\n" for entry in batch)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+            self.stats["written"] += len(batch)
+            if self.max_bytes and os.path.getsize(self.path) >= self.max_bytes:
+                self._rotate()
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Request log write failed: {str(e)}")
+
+    def _backup_name(self, index):
+        return f"{self.path}.{index}" + (".gz" if self.compress else "")
+
+    def _rotate(self):
+        # requests.jsonl -> requests.jsonl.1.gz, shifting older backups up and dropping the last
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(self._backup_name(index)):
+                os.replace(self._backup_name(index), self._backup_name(index + 1))
+        rotated = f"{self.path}.rotating"
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(self._backup_name(1), "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        else:
+            os.replace(rotated, self._backup_name(1))
+        self.stats["rotations"] += 1
+
+    def close(self, timeout=5):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def snapshot(self):
+        return dict(self.stats, queue_depth=self.queue.qsize(), policy=self.policy)
+
+
+def create_request_logger():
+    if os.getenv("REQUEST_LOG", "on").lower() in ["0", "off", "false"]:
+        return None
+    logger = RequestLogger(
+        path=os.getenv("REQUEST_LOG_PATH", "requests.jsonl"),
+        max_queue=int(os.getenv("REQUEST_LOG_QUEUE", "10000")),
+        max_bytes=int(os.getenv("REQUEST_LOG_MAX_BYTES", str(50 * 1024 * 1024))),
+        backup_count=int(os.getenv("REQUEST_LOG_BACKUPS", "5")),
+        policy=os.getenv("REQUEST_LOG_POLICY", "drop")
+    )
+    atexit.register(logger.close)  # Flush queued entries on shutdown
+    return logger
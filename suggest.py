@@ -0,0 +1,123 @@
+import re
+import threading
+from collections import Counter
+
+from clarification import KNOWN_BRANDS, FEATURE_KEYWORDS
+
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9\-]*")
+
+
+def catalog_terms(product):
+    # Item name (title without model numbers), its words, and the category; each counted once per product
+    words = [w for w in WORD_PATTERN.findall((product.get("title") or "").lower()) if len(w) > 2 and not any(c.isdigit() for c in w)]
+    terms = {" ".join(words)} | set(words)
+    if product.get("category"):
+        terms.add(product["category"])
+    return {t.strip() for t in terms if t.strip()}
+
+
+class _Node:
+    __slots__ = ("children", "term", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.term = None  # Set when a suggestion ends at this node
+        self.top = []     # Best (count, term) pairs in this subtree, highest first
+
+
+class SuggestionIndex:
+    # Prefix trie where every node keeps the top-k terms of its subtree, so a lookup is one walk
+    # down the prefix. A node's list is rebuilt from its children's lists, which keeps it exact
+    # when counts go down as well as up.
+    def __init__(self, k=8):
+        self.k = k
+        self.root = _Node()
+        self.counts = Counter()
+        self.display = {}
+        self._lock = threading.Lock()
+        self._seed_vocabulary()
+
+    def _seed_vocabulary(self):
+        # Brands and features are always suggested, even before the catalog mentions them
+        for term in KNOWN_BRANDS + FEATURE_KEYWORDS:
+            self.display.setdefault(term.lower(), term)
+            self.counts[term.lower()] += 1
+        self._rebuild()
+
+    def _recompute(self, node):
+        candidates = [(self.counts[node.term], node.term)] if node.term and self.counts[node.term] > 0 else []
+        for child in node.children.values():
+            candidates.extend(child.top)
+        candidates.sort(key=lambda c: (-c[0], c[1]))
+        node.top = candidates[:self.k]
+
+    def _rebuild(self):
+        # Bulk load: insert every term, then fill the top-k lists bottom-up in one pass
+        self.root = _Node()
+        for term in self.counts:
+            node = self.root
+            for ch in term:
+                node = node.children.setdefault(ch, _Node())
+            node.term = term
+        stack = [(self.root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                self._recompute(node)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+
+    def _update_term(self, term, delta):
+        self.counts[term] += delta
+        path = [self.root]
+        for ch in term:
+            path.append(path[-1].children.setdefault(ch, _Node()))
+        path[-1].term = term
+        for node in reversed(path):
+            self._recompute(node)
+        if self.counts[term] <= 0:
+            del self.counts[term]
+            path[-1].term = None
+
+    def load(self, products):
+        with self._lock:
+            self.counts = Counter()
+            self.display = {}
+            for p in products:
+                for term in catalog_terms(p):
+                    key = term.lower()
+                    self.display.setdefault(key, term)
+                    self.counts[key] += 1
+            self._seed_vocabulary()
+        return self
+
+    def apply(self, removed, added):
+        # CatalogStore listener: net out the changed products' terms and re-rank only their paths
+        deltas = Counter()
+        for p in removed:
+            for term in catalog_terms(p):
+                deltas[term.lower()] -= 1
+        for p in added:
+            for term in catalog_terms(p):
+                self.display.setdefault(term.lower(), term)
+                deltas[term.lower()] += 1
+        with self._lock:
+            for term, delta in deltas.items():
+                if delta:
+                    self._update_term(term, delta)
+
+    def suggest(self, prefix, limit=None):
+        node = self.root
+        for ch in " ".join(prefix.lower().split()):
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return [{"text": self.display.get(term, term), "count": count} for count, term in node.top[:limit or self.k]]
+
+
+def create_suggestion_index(catalog, k=8):
+    index = SuggestionIndex(k).load(catalog)
+    if hasattr(catalog, "subscribe"):
+        catalog.subscribe(index.apply, index.load)
+    return index
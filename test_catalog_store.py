@@ -0,0 +1,147 @@
+import multiprocessing
+
+import pytest
+
+from catalog_snapshot import CatalogSnapshot, compile_snapshot
+from catalog_store import CatalogStore
+
+PRODUCTS = [
+    {"product_id": "c1", "title": "Ergonomic Chair 1", "price": 100},
+    {"product_id": "c2", "title": "Ergonomic Chair 2", "price": 200},
+    {"product_id": "c3", "title": "Ergonomic Chair 3", "price": 300},
+    {"product_id": "c4", "title": "Task Chair 4", "price": 400},
+    {"product_id": "d1", "title": "Standing Desk 1", "price": 500},
+]
+
+
+@pytest.fixture
+def paths(tmp_path):
+    snapshot = str(tmp_path / "catalog.bin")
+    compile_snapshot(PRODUCTS, snapshot)
+    return snapshot, str(tmp_path / "catalog_updates.jsonl")
+
+
+def open_store(paths):
+    snapshot, journal = paths
+    return CatalogStore(CatalogSnapshot(snapshot), journal_path=journal, snapshot_path=snapshot)
+
+
+def ids(products):
+    return [p["product_id"] for p in products]
+
+
+def test_update_keeps_the_product_in_place(paths):
+    store = open_store(paths)
+    store.update(upserts=[{"product_id": "c3", "availability": "Out of stock"}])
+    results = store.search("chair", 1000, limit=3)
+    assert ids(results) == ["c1", "c2", "c3"]
+    assert results[2]["availability"] == "Out of stock"
+    assert ids(store) == ["c1", "c2", "c3", "c4", "d1"]
+
+
+def test_new_and_deleted_products(paths):
+    store = open_store(paths)
+    store.update(upserts=[{"product_id": "c5", "title": "Mesh Chair 5", "price": 50}], deletes=["c1"])
+    assert ids(store.search("chair", 1000)) == ["c2", "c3", "c4", "c5"]
+    assert store.get("c1") is None
+
+
+def test_compaction_keeps_the_order(paths):
+    store = open_store(paths)
+    store.update(upserts=[{"product_id": "c2", "price": 150}, {"product_id": "c5", "title": "Mesh Chair 5", "price": 50}])
+    before = list(store)
+    store.compact()
+    assert list(store) == before
+
+
+def test_other_store_replays_the_journal(paths):
+    writer, reader = open_store(paths), open_store(paths)
+    writer.update(upserts=[{"product_id": "d1", "price": 450}])
+    reader.refresh()
+    assert reader.get("d1")["price"] == 450
+    assert open_store(paths).get("d1")["price"] == 450  # Replayed at startup too
+
+
+def test_partial_last_line_waits_for_its_newline(paths):
+    store = open_store(paths)
+    store.update(upserts=[{"product_id": "d1", "price": 450}])
+    with open(paths[1], "a") as f:
+        f.write('{"op": "upsert", "product": {"product_id": "c1", "pr')
+    reader = open_store(paths)
+    assert reader.get("c1")["price"] == 100
+    with open(paths[1], "a") as f:
+        f.write('ice": 90}}\n')
+    reader.refresh()
+    assert reader.get("c1")["price"] == 90
+
+
+def test_torn_record_is_skipped(paths):
+    store = open_store(paths)
+    with open(paths[1], "a") as f:
+        f.write('{"op": "upse')  # A writer died mid-append
+    store.update(upserts=[{"product_id": "c4", "price": 380}])
+    assert store.get("c4")["price"] == 380
+    assert open_store(paths).get("c4")["price"] == 380
+
+
+def test_compaction_by_another_store_reloads_the_snapshot(paths):
+    reader, writer = open_store(paths), open_store(paths)
+    resets = []
+    reader.subscribe(lambda removed, added: None, resets.append)
+    writer.update(upserts=[{"product_id": "c1", "price": 90}])
+    reader.refresh()
+    writer.compact()
+    writer.update(upserts=[{"product_id": "c2", "price": 190}])  # The new journal is shorter than the reader's offset
+    reader.refresh()
+    assert len(resets) == 1
+    assert reader.get("c1")["price"] == 90
+    assert reader.get("c2")["price"] == 190
+    assert len(reader) == len(PRODUCTS)
+
+
+def test_store_started_before_the_journal_existed_sees_compaction(paths):
+    reader, writer = open_store(paths), open_store(paths)
+    writer.update(upserts=[{"product_id": "c5", "title": "Mesh Chair 5", "price": 50}])
+    writer.compact()
+    reader.refresh()
+    assert reader.get("c5") is not None
+    assert len(reader) == len(PRODUCTS) + 1
+
+
+def _write(paths, prefix, count, compact_every):
+    store = open_store(paths)
+    for i in range(count):
+        store.update(upserts=[{"product_id": f"{prefix}{i}", "title": f"Lamp {prefix}{i}", "price": 10}])
+        if compact_every and i % compact_every == compact_every - 1:
+            store.compact()
+
+
+def test_concurrent_writers_and_compaction_lose_nothing(paths):
+    workers = [multiprocessing.Process(target=_write, args=(paths, prefix, 30, 10 if prefix == "z" else 0)) for prefix in "xyz"]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert len(open_store(paths)) == len(PRODUCTS) + 90
+
+
+class RecordingIndex:
+    def __init__(self):
+        self.products = None
+        self.changes = []
+
+    def load(self, products):
+        self.products = list(products)
+
+    def apply(self, removed, added):
+        self.changes.append((removed, added))
+
+
+def test_attach_loads_once_and_follows_updates(paths):
+    store = open_store(paths)
+    first, second = RecordingIndex(), RecordingIndex()
+    store.attach(first, second)
+    assert ids(first.products) == ids(second.products) == ids(PRODUCTS)
+    store.update(upserts=[{"product_id": "d1", "price": 450}])
+    assert [ids(added) for _, added in first.changes] == [["d1"]]
+    assert second.changes == first.changes
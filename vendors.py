@@ -0,0 +1,296 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import quote_plus, urljoin
+
+import requests
+from bs4 import BeautifulSoup
+
+from product_identity import stable_product_id, merge_products
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5"
+}
+
+# Overall latency budget for one fan-out across every enabled vendor
+VENDOR_DEADLINE = float(os.getenv("VENDOR_DEADLINE", "8"))
+
+# Merged results per (item, budget) are reused for this many seconds
+VENDOR_CACHE_TTL = float(os.getenv("VENDOR_CACHE_TTL", "900"))
+VENDOR_CACHE_SIZE = int(os.getenv("VENDOR_CACHE_SIZE", "2000"))
+
+VENDOR_CONNECTORS = {}
+
+
+def register_vendor(cls):
+    VENDOR_CONNECTORS[cls.name] = cls
+    return cls
+
+
+class CircuitBreaker:
+    # Closed: calls flow. Open: calls are skipped until reset_timeout passes.
+    # Half-open: one trial call decides whether to close again or re-open.
+    def __init__(self, failure_threshold=3, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.time() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.time()
+
+
+class VendorConnector:
+    name = None
+    timeout = 6  # Seconds this vendor may take, including retries
+    attempts = 2
+    max_results = 3
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or float(os.getenv(f"{self.name.upper()}_TIMEOUT", self.timeout))
+        self.breaker = CircuitBreaker()
+
+    def search_url(self, item):
+        raise NotImplementedError
+
+    def parse(self, soup, base_url, item, budget):
+        raise NotImplementedError
+
+    def search(self, item, budget):
+        # Retries share the vendor's time budget instead of each getting a full timeout
+        started = time.time()
+        base_url = self.search_url(item)
+        for attempt in range(self.attempts):
+            remaining = self.timeout - (time.time() - started)
+            if remaining <= 0:
+                break
+            response = requests.get(base_url, headers=HEADERS, timeout=remaining)
+            response.raise_for_status()
+            products = self.parse(BeautifulSoup(response.content, "html.parser"), base_url, item, budget)
+            if products:
+                return products[:self.max_results]
+            backoff = 2 ** attempt * 0.5
+            if time.time() - started + backoff >= self.timeout:
+                break
+            time.sleep(backoff)
+        return []
+
+    def product(self, title, price, link, item, **extra):
+        product = {
+            "title": title,
+            "price": price,
+            "link": link,
+            "description": f"From {self.name}",
+            "availability": "Check site",
+            "delivery_time": "Varies",
+            "vendor": self.name,
+            "product_id": stable_product_id(title, self.name, link),
+            "category": item.capitalize()  # Use the search item as category
+        }
+        product.update(extra)
+        return product
+
+
+def parse_price(text):
+    text = text.strip().replace(",", "").replace("$", "").replace("₹", "")
+    return float(text) if text.replace(".", "").isdigit() else float("inf")
+
+
+@register_vendor
+class AmazonConnector(VendorConnector):
+    name = "Amazon"
+
+    def search_url(self, item):
+        return f"https://www.amazon.com/s?k={quote_plus(item)}"
+
+    def parse(self, soup, base_url, item, budget):
+        products = []
+        for product in soup.select(".s-result-item"):
+            title_elem = product.select_one(".a-text-normal")
+            price_elem = product.select_one(".a-price-whole")
+            link_elem = product.select_one(".a-link-normal")
+            availability_elem = product.select_one(".a-row.a-size-base:contains('In Stock')") or product.select_one(".a-row.a-size-base:contains('Only')")
+            delivery_elem = product.select_one(".a-row:contains('FREE delivery')") or product.select_one(".a-row:contains('Get it as soon as')")
+            if not (title_elem and price_elem and link_elem):
+                continue
+            title = title_elem.get_text(strip=True)
+            price = parse_price(price_elem.get_text(strip=True))
+            link = urljoin(base_url, link_elem.get("href"))
+
+            availability = "In Stock" if availability_elem and "In Stock" in availability_elem.get_text() else "Check site"
+            if availability_elem and "Only" in availability_elem.get_text():
+                availability = "Limited Stock"
+
+            delivery_time = "Varies"
+            if delivery_elem:
+                delivery_text = delivery_elem.get_text(strip=True).lower()
+                if "free delivery" in delivery_text or "get it as soon as" in delivery_text:
+                    if "tomorrow" in delivery_text or "next day" in delivery_text:
+                        delivery_time = "1 day"
+                    elif "2 days" in delivery_text or "two days" in delivery_text:
+                        delivery_time = "2 days"
+                    elif any(day in delivery_text for day in ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]):
+                        delivery_time = "2-5 days"  # Approximate based on typical Amazon delivery
+
+            if price <= budget:
+                products.append(self.product(title, price, link, item, availability=availability, delivery_time=delivery_time))
+        return products
+
+
+@register_vendor
+class FlipkartConnector(VendorConnector):
+    name = "Flipkart"
+    inr_per_usd = float(os.getenv("INR_PER_USD", "83"))  # Budgets are in dollars, Flipkart lists rupees
+
+    def search_url(self, item):
+        return f"https://www.flipkart.com/search?q={quote_plus(item)}"
+
+    def parse(self, soup, base_url, item, budget):
+        products = []
+        for product in soup.select("div[data-id]"):
+            title_elem = product.select_one("a[title]") or product.select_one("div._4rR01T") or product.select_one("a.IRpwTa")
+            price_elem = product.select_one("div._30jeq3") or product.select_one("div.Nx9bqj")
+            link_elem = product.select_one("a[href]")
+            if not (title_elem and price_elem and link_elem):
+                continue
+            title = title_elem.get("title") or title_elem.get_text(strip=True)
+            price = round(parse_price(price_elem.get_text(strip=True)) / self.inr_per_usd, 2)
+            link = urljoin(base_url, link_elem.get("href"))
+            if price <= budget:
+                products.append(self.product(title, price, link, item))
+        return products
+
+
+@register_vendor
+class ExampleConnector(VendorConnector):
+    # Placeholder target used by generate_catalog.py; enable it in policies.json to query it live
+    name = "Example"
+    attempts = 1
+    max_results = 20
+
+    def search_url(self, item):
+        return f"https://example.com/search?q={quote_plus(item)}"
+
+    def parse(self, soup, base_url, item, budget):
+        products = []
+        for product in soup.select(".product-item"):
+            title = product.select_one(".product-name").text.strip()
+            price = parse_price(product.select_one(".product-price").text)
+            if price <= budget:
+                products.append(self.product(title, price, base_url, item, delivery_time="Free delivery"))
+        return products
+
+
+def load_enabled_vendors(policy_path="policies.json"):
+    try:
+        with open(policy_path, "r") as f:
+            names = json.load(f).get("approved_vendors", [])
+    except (OSError, ValueError):
+        names = ["Amazon"]
+    return [VENDOR_CONNECTORS[name]() for name in names if name in VENDOR_CONNECTORS]
+
+
+vendors = load_enabled_vendors()
+_pool = ThreadPoolExecutor(max_workers=int(os.getenv("VENDOR_WORKERS", "16")), thread_name_prefix="vendor")
+
+
+def _call_vendor(connector, item, budget):
+    started = time.time()
+    try:
+        products = connector.search(item, budget)
+    except Exception as e:
+        connector.breaker.record_failure()
+        print(f"{connector.name} search failed: {str(e)}")
+        return []
+    # A vendor that only answers after its own timeout counts as failing
+    if time.time() - started > connector.timeout:
+        connector.breaker.record_failure()
+    else:
+        connector.breaker.record_success()
+    return products
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+cache_stats = {"hits": 0, "misses": 0}
+
+
+def _cache_key(item, budget):
+    return (" ".join(item.lower().split()), float(budget))
+
+
+def cached_vendor_results(item, budget):
+    key = _cache_key(item, budget)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and time.time() - entry[0] < VENDOR_CACHE_TTL:
+            _cache.move_to_end(key)
+            cache_stats["hits"] += 1
+            return [dict(p) for p in entry[1]]
+        cache_stats["misses"] += 1
+        return None
+
+
+def _store_vendor_results(item, budget, products):
+    with _cache_lock:
+        _cache[_cache_key(item, budget)] = (time.time(), products)
+        _cache.move_to_end(_cache_key(item, budget))
+        while len(_cache) > VENDOR_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def search_vendors(item, budget, deadline=None, connectors=None):
+    # Query every enabled vendor concurrently and merge whatever has arrived by the deadline.
+    # Late vendors keep running in the background so their breakers still see the outcome.
+    if connectors is None:
+        cached = cached_vendor_results(item, budget)
+        if cached is not None:
+            return cached
+    futures = [_pool.submit(_call_vendor, c, item, budget) for c in (vendors if connectors is None else connectors) if c.breaker.allow()]
+    if not futures:
+        return []
+    done, not_done = wait(futures, timeout=VENDOR_DEADLINE if deadline is None else deadline)
+    if not_done:
+        print(f"{len(not_done)} vendor(s) missed the {VENDOR_DEADLINE if deadline is None else deadline}s deadline for '{item}'.")
+    products = merge_products(*[f.result() for f in futures if f in done])
+    # Only complete, non-empty answers are cached so a slow or failing vendor is retried next time
+    if connectors is None and products and not not_done:
+        _store_vendor_results(item, budget, products)
+    return [dict(p) for p in products]
+
+
+def vendor_status():
+    return {c.name: {"state": c.breaker.state, "failures": c.breaker.failures, "timeout": c.timeout} for c in vendors}
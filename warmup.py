@@ -0,0 +1,135 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+
+def _context_query(context):
+    if isinstance(context, str):
+        try:
+            context = json.loads(context)
+        except ValueError:
+            return None
+    if not isinstance(context, dict) or not context.get("item") or not context.get("budget"):
+        return None
+    item = context.get("vendor_item") or context["item"]  # Vendor searches use the item as typed
+    try:
+        return " ".join(str(item).lower().split()), float(context["budget"])
+    except (TypeError, ValueError):
+        return None
+
+
+def top_queries(db_path="chatbot.db", log_path="requests.jsonl", limit=50, max_log_lines=200000):
+    # Most frequent (item, budget) pairs and raw inputs from the conversations table and the request log
+    queries = Counter()
+    inputs = Counter()
+    if db_path and os.path.exists(db_path):
+        try:
+            with sqlite3.connect(db_path, timeout=5) as conn:
+                for user_input, context in conn.execute("SELECT user_input, context FROM conversations"):
+                    query = _context_query(context)
+                    if query:
+                        queries[query] += 1
+                    if user_input:
+                        inputs[user_input.strip()] += 1
+        except sqlite3.Error as e:
+            print(f"Warm-up could not read {db_path}: {str(e)}")
+    if log_path and os.path.exists(log_path):
+        with open(log_path, "r", encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                if i >= max_log_lines:
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(entry, dict) or entry.get("kind") not in ["turn", "batch"]:
+                    continue
+                query = _context_query(entry.get("context"))
+                if query:
+                    queries[query] += 1
+                if entry.get("input") and not entry.get("current_slot"):
+                    inputs[entry["input"].strip()] += 1
+    return [q for q, _ in queries.most_common(limit)], [i for i, _ in inputs.most_common(limit)]
+
+
+class CacheWarmer:
+    # Prefetches candidate lists (and optionally extraction results) for popular historical
+    # queries on a background thread, stopping when the time budget runs out.
+    def __init__(self, prefetch, load_history, extract=None, time_budget=60, lookup=None):
+        self.prefetch = prefetch
+        self.lookup = lookup
+        self.load_history = load_history
+        self.extract = extract
+        self.time_budget = time_budget
+        self.report = {"status": "pending", "queries": 0, "inputs": 0,
+                       "warmed": 0, "uncached": 0, "extracted": 0, "errors": 0, "cold_ms": None, "warm_ms": None, "elapsed_s": None}
+        self._thread = threading.Thread(target=self._run, name="cache-warmup", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _timed(self, fn, *args):
+        started = time.time()
+        result = fn(*args)
+        return (time.time() - started) * 1000, result
+
+    def _run(self):
+        started = time.time()
+        self.report["status"] = "running"
+        queries, inputs = self.load_history()  # Read history here too, off the startup path
+        inputs = inputs if self.extract else []
+        self.report.update({"queries": len(queries), "inputs": len(inputs)})
+        cold, warm = [], []
+        out_of_time = False
+        for item, budget in queries:
+            if time.time() - started >= self.time_budget:
+                out_of_time = True
+                break
+            try:
+                cold.append(self._timed(self.prefetch, item, budget)[0])
+                self.report["warmed"] += 1
+                if self.lookup:
+                    # Warm time is the cache read a repeat request would get; prefetches that
+                    # cached nothing (no results, or vendors that timed out) are left out
+                    elapsed, cached = self._timed(self.lookup, item, budget)
+                    if cached is None:
+                        self.report["uncached"] += 1
+                    else:
+                        warm.append(elapsed)
+            except Exception as e:
+                self.report["errors"] += 1
+                print(f"Warm-up failed for '{item}' under ${budget}: {str(e)}")
+        for user_input in inputs:
+            if time.time() - started >= self.time_budget:
+                out_of_time = True
+                break
+            try:
+                self.extract(user_input)
+                self.report["extracted"] += 1
+            except Exception as e:
+                self.report["errors"] += 1
+                print(f"Warm-up extraction failed for '{user_input}': {str(e)}")
+        self.report.update({
+            "status": "budget_exhausted" if out_of_time else "done",
+            "cold_ms": round(sum(cold) / len(cold), 1) if cold else None,
+            "warm_ms": round(sum(warm) / len(warm), 2) if warm else None,
+            "elapsed_s": round(time.time() - started, 2)
+        })
+        print(f"Cache warm-up {self.report['status']}: {self.report['warmed']} queries, cold {self.report['cold_ms']} ms vs warm {self.report['warm_ms']} ms on average.")
+
+
+def start_warmup(prefetch, extract=None, lookup=None):
+    # Runs in the background so the app is ready immediately; WARMUP_SECONDS=0 disables it
+    time_budget = float(os.getenv("WARMUP_SECONDS", "60"))
+    if time_budget <= 0:
+        return None
+    load_history = lambda: top_queries(
+        db_path=os.getenv("WARMUP_DB", "chatbot.db"),
+        log_path=os.getenv("REQUEST_LOG_PATH", "requests.jsonl"),
+        limit=int(os.getenv("WARMUP_QUERIES", "50"))
+    )
+    return CacheWarmer(prefetch, load_history, extract, time_budget, lookup).start()